@@ -0,0 +1,186 @@
+import hashlib
+import sqlite3
+import threading
+
+import pandas as pd
+
+# Tables, their columns and the indexes the dashboard's filters use
+SCHEMA = {
+    "population": ("region TEXT, year INTEGER, population REAL",
+                   ["CREATE INDEX population_region_year ON population (region, year)",
+                    "CREATE INDEX population_year ON population (year)"]),
+    "vehicles": ("state TEXT, year INTEGER, vehicles REAL",
+                 ["CREATE INDEX vehicles_state_year ON vehicles (state, year)"]),
+    "emissions": ("transport TEXT, carbon_emission REAL",
+                  ["CREATE INDEX emissions_transport ON emissions (transport)"]),
+    "occupancy": ("street TEXT, recorded_at TEXT, weekday INTEGER, hour INTEGER, occupied INTEGER, "
+                  "observed INTEGER",
+                  ["CREATE INDEX occupancy_street_time ON occupancy (street, weekday, hour)",
+                   "CREATE INDEX occupancy_recorded_at ON occupancy (recorded_at)"]),
+}
+
+# Days of recorded polls kept in the occupancy table; older rows are pruned as new polls arrive
+OCCUPANCY_RETENTION_DAYS = 28
+
+
+def frame_version(frame):
+    """
+    Content hash of a DataFrame, used to skip reloading a table with unchanged data
+    """
+    hashed = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    return hashlib.sha1(hashed.tobytes() + ",".join(map(str, frame.columns)).encode("utf-8")).hexdigest()
+
+
+def year_columns(frame):
+    return [col for col in frame.columns if col.isdigit()]
+
+
+class AnalyticsStore:
+    """
+    In-memory SQLite store of the cleaned datasets and recorded occupancy, with indexes
+    on the columns the dashboard filters by.
+
+    Tables are (re)loaded with sync() only when their source data changes; pages then
+    run indexed queries instead of scanning DataFrames. One connection is shared by
+    all sessions behind a lock.
+    """
+
+    def __init__(self, path=":memory:"):
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._versions = {}
+        with self._lock, self._connection:
+            for table, (columns, indexes) in SCHEMA.items():
+                self._connection.execute(f"CREATE TABLE {table} ({columns})")
+                for index in indexes:
+                    self._connection.execute(index)
+
+    def _replace(self, table, rows):
+        with self._lock, self._connection:
+            self._connection.execute(f"DELETE FROM {table}")
+            placeholders = ", ".join("?" * len(rows.columns))
+            # Object dtype hands sqlite3 plain Python ints/floats rather than NumPy scalars
+            self._connection.executemany(f"INSERT INTO {table} VALUES ({placeholders})",
+                                         rows.astype(object).itertuples(index=False, name=None))
+            self._connection.execute(f"ANALYZE {table}")
+
+    def sync(self, table, frame, version=None):
+        """
+        Load a source frame into a table unless the same version is already loaded.
+
+        version defaults to the frame's content hash; pass a cheaper one (e.g. a file's
+        modification time) for large frames.
+        """
+        version = frame_version(frame) if version is None else version
+        if self._versions.get(table) == version:
+            return False
+        self._replace(table, ROW_BUILDERS[table](frame))
+        self._versions[table] = version
+        return True
+
+    def query(self, sql, params=()):
+        """
+        Run a read query and return the result as a DataFrame
+        """
+        with self._lock:
+            cursor = self._connection.execute(sql, params)
+            columns = [description[0] for description in cursor.description]
+            rows = cursor.fetchall()
+        return pd.DataFrame(rows, columns=columns)
+
+    def population(self, regions=None, years=None):
+        """
+        Population per year (rows) and region (columns), in the order of regions
+        """
+        sql = "SELECT region, year, population FROM population"
+        clauses, params = _in_clauses({"region": regions, "year": years})
+        long = self.query(sql + clauses + " ORDER BY year", params)
+        wide = long.pivot(index="year", columns="region", values="population")
+        wide.index = wide.index.astype(str)
+        wide.index.name = None
+        wide.columns.name = None
+        return wide[list(regions)] if regions else wide
+
+    def vehicles(self, state):
+        """
+        Years and vehicle ownership of one state, oldest first
+        """
+        result = self.query("SELECT year, vehicles FROM vehicles WHERE state = ? ORDER BY year", (state,))
+        return result["year"].astype(str).tolist(), result["vehicles"].to_numpy()
+
+    def emissions(self):
+        """
+        Average carbon emission per transport type, highest first
+        """
+        return self.query("SELECT transport, carbon_emission FROM emissions ORDER BY carbon_emission DESC")
+
+    def record_occupancy(self, counts_df, retention_days=OCCUPANCY_RETENTION_DAYS):
+        """
+        Append status polls (street, timestamp, occupied, observed), dropping polls
+        older than retention_days before the newest one
+        """
+        timestamps = pd.to_datetime(counts_df["timestamp"])
+        rows = pd.DataFrame({
+            "street": counts_df["street"].astype(str),
+            "recorded_at": timestamps.dt.strftime("%Y-%m-%dT%H:%M:%S"),
+            "weekday": timestamps.dt.weekday,
+            "hour": timestamps.dt.hour,
+            "occupied": counts_df["occupied"],
+            "observed": counts_df["observed"],
+        })
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT INTO occupancy VALUES (?, ?, ?, ?, ?, ?)",
+                                         rows.astype(object).itertuples(index=False, name=None))
+            cutoff = timestamps.max() - pd.Timedelta(days=retention_days)
+            self._connection.execute("DELETE FROM occupancy WHERE recorded_at < ?",
+                                     (cutoff.strftime("%Y-%m-%dT%H:%M:%S"),))
+
+    def occupancy_rate(self, street=None, weekday=None):
+        """
+        Occupancy rate (%) per street and hour from the recorded polls
+        """
+        clauses, params = _in_clauses({"street": [street] if street else None,
+                                       "weekday": [weekday] if weekday is not None else None})
+        return self.query("SELECT street, hour, 100.0 * SUM(occupied) / SUM(observed) AS occupancy_rate "
+                          f"FROM occupancy{clauses} GROUP BY street, hour HAVING SUM(observed) > 0 "
+                          "ORDER BY street, hour", params)
+
+
+def _in_clauses(filters):
+    """
+    WHERE clause and parameters for column IN (...) filters; empty filters are skipped
+    """
+    clauses, params = [], []
+    for column, values in filters.items():
+        if values:
+            values = list(values)
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _population_rows(population):
+    years = year_columns(population)
+    long = population.melt(id_vars="region", value_vars=years, var_name="year", value_name="population")
+    long["year"] = long["year"].astype(int)
+    long["population"] = long["population"].astype(float)
+    return long[["region", "year", "population"]]
+
+
+def _vehicle_rows(vehicle_ownership):
+    years = year_columns(vehicle_ownership)
+    long = vehicle_ownership.melt(id_vars="state", value_vars=years, var_name="year", value_name="vehicles")
+    long["year"] = long["year"].astype(int)
+    return long[["state", "year", "vehicles"]]
+
+
+def _emission_rows(carbon_emission):
+    return carbon_emission[["transport", "carbon_emission"]]
+
+
+# How each table's rows are built from its source frame
+ROW_BUILDERS = {
+    "population": _population_rows,
+    "vehicles": _vehicle_rows,
+    "emissions": _emission_rows,
+}
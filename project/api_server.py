@@ -0,0 +1,262 @@
+"""
+Lightweight JSON API and static file server for the bundled dist/ frontend.
+
+Run with:
+    python api_server.py --port 8080
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from collections import OrderedDict
+
+import pandas as pd
+from aiohttp import web
+
+import data_api
+from data_sources import load_dataset
+from shared_cache import shared_cache
+
+DIST_DIR = os.path.join(os.path.dirname(__file__), "dist")
+
+# Seconds each endpoint's response stays cached
+ANALYTICS_TTL = 3600
+STREETS_TTL = 3600
+ZONES_TTL = 600
+STATUS_TTL = 30
+
+# Vite build output names carry a content hash, e.g. index-H80fRay-.js
+HASHED_ASSET = re.compile(r"-[A-Za-z0-9_-]{8}\.[a-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Streets whose zone/status responses are kept; the least recently requested are dropped first
+MAX_CACHED_STREETS = 256
+
+# Bodies of empty results, which mostly come from failed upstream calls and are not cached
+EMPTY_BODIES = {b"", b"[]", b"{}", b"null"}
+
+# Content-Encoding and the file suffix written by compress_assets.py, in order of preference
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+class ResponseCache:
+    """
+    Serialized JSON bodies kept in the process-wide shared cache, so a cache hit
+    costs no encoding at all and counts against the same memory budget as the
+    dashboard's datasets.
+
+    Empty bodies and last-known-good fallbacks (the upstream circuit is open) are
+    served but not cached. Per-street keys come from the query string, so only the
+    max_streets most recently requested streets are kept.
+    """
+
+    def __init__(self, max_streets=MAX_CACHED_STREETS):
+        self.max_streets = max_streets
+        self._streets = OrderedDict()
+
+    def _track_street(self, key):
+        self._streets[key] = None
+        self._streets.move_to_end(key)
+        while len(self._streets) > self.max_streets:
+            oldest, _ = self._streets.popitem(last=False)
+            shared_cache.discard(("api_server", oldest))
+
+    async def get(self, key, ttl, loader, upstream_url=None, per_street=False):
+        def keep(body):
+            return body not in EMPTY_BODIES and not (upstream_url and data_api.is_stale(upstream_url))
+
+        def load():
+            return shared_cache.get_or_load(("api_server", key), lambda: to_json_bytes(loader()),
+                                            ttl=ttl, dataset="api_responses", keep=keep)
+
+        if per_street:
+            self._track_street(key)
+        # Loads block on upstream requests, so they run in a worker thread; concurrent
+        # requests for a cold key share one upstream call
+        return await asyncio.get_running_loop().run_in_executor(None, load)
+
+
+def to_json_bytes(data):
+    """
+    Serialize fetcher output (DataFrame, list or dict) to a JSON body
+    """
+    if isinstance(data, pd.DataFrame):
+        return data.to_json(orient="records").encode("utf-8")
+    return json.dumps(data).encode("utf-8")
+
+
+def json_response(body):
+    return web.Response(body=body, content_type="application/json")
+
+
+def street_param(request):
+    street = " ".join(request.query.get("street", "").split())
+    if not street:
+        raise web.HTTPBadRequest(text="Query parameter 'street' is required")
+    return street
+
+
+async def streets(request):
+    cache = request.app["cache"]
+    return json_response(await cache.get("streets", STREETS_TTL, data_api.get_streets_list,
+                                          upstream_url=data_api.STREETS_URL))
+
+
+async def zones(request):
+    street = street_param(request)
+    cache = request.app["cache"]
+    return json_response(await cache.get(("zones", street), ZONES_TTL,
+                                          lambda: data_api.get_parking_zones_info(street),
+                                          upstream_url=data_api.SIGN_PLATES_URL, per_street=True))
+
+
+async def status(request):
+    street = street_param(request)
+    cache = request.app["cache"]
+    return json_response(await cache.get(("status", street), STATUS_TTL,
+                                          lambda: data_api.get_parking_status_records(street),
+                                          upstream_url=data_api.STATUS_URL, per_street=True))
+
+
+async def population(request):
+    cache = request.app["cache"]
+    return json_response(await cache.get("population", ANALYTICS_TTL, lambda: load_dataset("population_growth")))
+
+
+async def vehicles(request):
+    cache = request.app["cache"]
+    return json_response(await cache.get("vehicles", ANALYTICS_TTL, lambda: load_dataset("vehicle_ownership")))
+
+
+async def emissions(request):
+    cache = request.app["cache"]
+    return json_response(await cache.get("emissions", ANALYTICS_TTL, lambda: load_dataset("carbon_emission")))
+
+
+async def health(request):
+    return json_response(to_json_bytes(data_api.upstream_health()))
+
+
+async def cache_stats(request):
+    return json_response(to_json_bytes(shared_cache.stats()))
+
+
+class StaticFiles:
+    """
+    In-memory copies of the dist/ files with their precompressed variants and ETags.
+
+    Entries are reloaded when the file's modification time changes.
+    """
+
+    def __init__(self, dist_dir):
+        self.dist_dir = os.path.realpath(dist_dir)
+        self._entries = {}
+
+    def resolve(self, relative_path):
+        """
+        Absolute path of a file inside dist/, or index.html for client-side routes
+        """
+        file_path = os.path.realpath(os.path.join(self.dist_dir, relative_path or "index.html"))
+        if not file_path.startswith(self.dist_dir + os.sep) or not os.path.isfile(file_path):
+            file_path = os.path.join(self.dist_dir, "index.html")
+        return file_path
+
+    def load(self, file_path):
+        mtime = os.path.getmtime(file_path)
+        entry = self._entries.get(file_path)
+        if entry is not None and entry["mtime"] == mtime:
+            return entry
+
+        with open(file_path, "rb") as f:
+            content = f.read()
+        variants = {"identity": content}
+        for encoding, suffix in ENCODINGS:
+            if os.path.isfile(file_path + suffix):
+                with open(file_path + suffix, "rb") as f:
+                    variants[encoding] = f.read()
+
+        entry = {
+            "mtime": mtime,
+            "digest": hashlib.sha1(content).hexdigest()[:16],
+            "content_type": mimetypes.guess_type(file_path)[0] or "application/octet-stream",
+            "cache_control": (IMMUTABLE_CACHE_CONTROL if HASHED_ASSET.search(os.path.basename(file_path))
+                              else REVALIDATE_CACHE_CONTROL),
+            "variants": variants,
+        }
+        self._entries[file_path] = entry
+        return entry
+
+
+def accepted_encodings(request):
+    """
+    Content codings the client accepts (q=0 entries excluded)
+    """
+    accepted = set()
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        try:
+            excluded = bool(params) and float(quality) == 0
+        except ValueError:
+            excluded = False
+        if name and not excluded:
+            accepted.add(name.lower())
+    return accepted
+
+
+async def frontend(request):
+    """
+    Serve files from dist/ with ETags, precompressed variants and cache headers,
+    falling back to index.html for client-side routes
+    """
+    static_files = request.app["static_files"]
+    entry = static_files.load(static_files.resolve(request.match_info["path"]))
+
+    accepted = accepted_encodings(request)
+    encoding = next((name for name, _ in ENCODINGS if name in entry["variants"] and
+                     (name in accepted or "*" in accepted)), "identity")
+
+    # Each encoding is a different representation, so each gets its own strong validator
+    etag = '"' + entry["digest"] + ("" if encoding == "identity" else "-" + encoding) + '"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": entry["cache_control"],
+        "Vary": "Accept-Encoding",
+    }
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")] or if_none_match == "*":
+        return web.Response(status=304, headers=headers)
+
+    return web.Response(body=entry["variants"][encoding], content_type=entry["content_type"], headers=headers)
+
+
+def create_app(dist_dir=DIST_DIR):
+    app = web.Application()
+    app["cache"] = ResponseCache()
+    app["static_files"] = StaticFiles(dist_dir)
+    app.router.add_get("/api/streets", streets)
+    app.router.add_get("/api/zones", zones)
+    app.router.add_get("/api/status", status)
+    app.router.add_get("/api/population", population)
+    app.router.add_get("/api/vehicles", vehicles)
+    app.router.add_get("/api/emissions", emissions)
+    app.router.add_get("/api/health", health)
+    app.router.add_get("/api/cache", cache_stats)
+    app.router.add_get("/{path:.*}", frontend)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the dist/ frontend and cached JSON endpoints")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    web.run_app(create_app(), host=args.host, port=args.port)
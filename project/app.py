@@ -1,11 +1,24 @@
-import json
-import re
+import time
+from datetime import datetime
 
-import pandas as pd
 import plotly.graph_objects as go
-import requests
 import streamlit as st
 
+import data_api
+import data_sources
+from analytics_store import AnalyticsStore
+from chart_utils import scatter_trace, time_series_traces
+from emission_cube import (FILTER_DIMENSIONS, HABIT_COLUMNS, load_emission_cube, load_emission_quantiles,
+                           load_habit_emissions, rollup)
+from paged_table import show_paged_table
+from parking_delta import StatusTracker
+from population_analytics import growth_summary, growth_table, load_sa2_population
+from parking_history import MELBOURNE_TZ, WEEKDAYS, OccupancyHistory
+from parking_index import BayZoneIndex
+from parking_restrictions import RestrictionIndex
+from parking_spatial import CBD_LATITUDE, CBD_LONGITUDE, BayLocationIndex, viewport_bounds
+from shared_cache import cached, shared_cache
+
 # Page configuration
 st.set_page_config(
     page_title="Melbourne CBD Parking & Transport Dashboard",
@@ -146,67 +159,165 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# Data preparation functions
-@st.cache_data
-def get_population_data(api_url="https://ldr1cwcs34.execute-api.ap-southeast-2.amazonaws.com/getPopulationGrowth"):
+# Analytics query results are recomputed after this many seconds
+ANALYTICS_CACHE_TTL = 3600
+# Seconds per-street results stay cached
+ZONES_CACHE_TTL = 600
+STATUS_CACHE_TTL = 15
+# Eviction weights in the shared cache: small, expensive datasets are kept longest
+ANALYTICS_CACHE_WEIGHT = 4.0
+STREET_RESULT_CACHE_WEIGHT = 1.0
+
+
+@st.cache_resource
+def get_analytics_store():
     """
-    Obtain population data from the API and process it into data for the CBD area.
+    Shared indexed store of the analytics datasets and recorded occupancy
     """
-    # Fetch data from Lambda/API Gateway
-    response = requests.get(api_url)
-    data = response.json()  # Should be a list of dicts
+    return AnalyticsStore()
 
-    # Convert to DataFrame
-    population_growth = pd.DataFrame(data)
 
-    # Filter only CBD data
+def get_synced_store(table, dataset, source=None):
+    """
+    The analytics store with a table reloaded if its source dataset has changed
+    """
+    store = get_analytics_store()
+    store.sync(table, data_sources.load_dataset(dataset, source))
+    return store
+
+
+# Data preparation functions
+@cached(ttl=ANALYTICS_CACHE_TTL, weight=ANALYTICS_CACHE_WEIGHT)
+def get_population_data(source=None):
+    """
+    Obtain population data from the data source and query the CBD regions from the store.
+    """
     regions = ["Melbourne CBD - East", "Melbourne CBD - North", "Melbourne CBD - West"]
-    population_growth_cbd = population_growth[population_growth["region"].isin(regions)]
-    year_columns = [col for col in population_growth.columns if
-                    col.isdigit() or (col.startswith("20") and col[2:].isdigit())]
-    population_growth_cbd = population_growth_cbd.set_index("region").loc[regions, year_columns].T.astype(float)
+    population_growth_cbd = get_synced_store("population", "population_growth", source).population(regions)
 
     return population_growth_cbd, regions
 
-@st.cache_data
-def get_vehicle_data(api_url="https://ldr1cwcs34.execute-api.ap-southeast-2.amazonaws.com/getVehicleOwnership"):
+@cached(ttl=ANALYTICS_CACHE_TTL, weight=ANALYTICS_CACHE_WEIGHT)
+def get_vehicle_data(source=None):
     """
     Obtain the data on vehicle ownership in Victoria
     """
-    # Fetch data from Lambda/API Gateway
-    response = requests.get(api_url)
-    data = response.json()  # Should be a list of dicts
-
-    # Convert to DataFrame
-    vehicle_ownership = pd.DataFrame(data)
-
-    # Filter only Victoria data
-    vic_data = vehicle_ownership[vehicle_ownership["state"] == "Vic."]
-
-    # Get year columns
-    years = [col for col in vehicle_ownership.columns if col.isdigit()]
+    return get_synced_store("vehicles", "vehicle_ownership", source).vehicles("Vic.")
 
-    # Extract Victoria values
-    vic_values = vic_data[years].values.flatten()
-
-    return years, vic_values
-
-@st.cache_data
-def get_environmental_data(api_url="https://ldr1cwcs34.execute-api.ap-southeast-2.amazonaws.com/getCarbonEmission"):
+@cached(ttl=ANALYTICS_CACHE_TTL, weight=ANALYTICS_CACHE_WEIGHT)
+def get_environmental_data(source=None):
     """
-    Obtain carbon emission data
+    Obtain carbon emission data, highest emission first
     """
-    # Fetch data from Lambda/API Gateway
-    response = requests.get(api_url)
-    data = response.json()  # Should be a list of dicts
+    return get_synced_store("emissions", "carbon_emission", source).emissions()
 
-    # Convert to DataFrame
-    carbon_emission = pd.DataFrame(data)
+def get_filtered_emissions(filters):
+    """
+    Average carbon emission per transport type for the filtered respondents, read from the emissions cube
+    """
+    emissions = rollup(load_emission_cube(), ["Mode"], filters)
+    carbon_emission_sorted = emissions.rename(columns={"Mode": "transport", "mean": "carbon_emission"})
+    carbon_emission_sorted["transport"] = carbon_emission_sorted["transport"].astype(str)
+    return carbon_emission_sorted, int(emissions["count"].sum())
 
-    # Sort by carbon_emission descending
-    carbon_emission_sorted = carbon_emission.sort_values(by='carbon_emission', ascending=False).reset_index(drop=True)
+def show_emission_filters():
+    """
+    Drill-down filters over the emissions cube dimensions; returns {dimension: selected values}.
 
-    return carbon_emission_sorted
+    Nothing is shown (and no filters apply) when the raw survey is not deployed.
+    """
+    filters = {}
+    try:
+        cube = load_emission_cube()
+    except Exception as e:
+        print(f"Emission cube unavailable: {str(e)}")
+        cube = None
+    if cube is None:
+        return filters
+    with st.expander("Filter survey respondents"):
+        columns = st.columns(len(FILTER_DIMENSIONS))
+        for column, dimension in zip(columns, FILTER_DIMENSIONS):
+            options = list(cube[dimension].cat.categories)
+            filters[dimension] = column.multiselect(dimension, options, key=f"emission_filter_{dimension}")
+    return filters
+
+def show_emission_distribution():
+    """
+    Spread of individual emissions, drawn from precomputed sketch percentiles
+    (skipped when the raw survey is not deployed)
+    """
+    try:
+        quantiles = load_emission_quantiles()
+    except Exception as e:
+        print(f"Emission quantiles unavailable: {str(e)}")
+        quantiles = None
+    if quantiles is None:
+        return
+
+    distribution_plot = go.Figure(
+        go.Box(
+            x=quantiles['Mode'],
+            q1=quantiles['p25'],
+            median=quantiles['p50'],
+            q3=quantiles['p75'],
+            lowerfence=quantiles['p5'],
+            upperfence=quantiles['p95'],
+            marker_color="#66c2a5",
+            name="Carbon emission"
+        )
+    )
+    distribution_plot.update_layout(
+        title=dict(
+            text="Distribution of Individual Carbon Emission by Transport Type (Kg/Month)",
+            x=0.5,
+            xanchor="center"
+        ),
+        xaxis_title="Transport Type",
+        yaxis_title="Carbon Emission (Kg/Month)",
+        height=450,
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    st.plotly_chart(distribution_plot, use_container_width=True)
+    st.caption("Boxes span the 25th-75th percentiles; whiskers the 5th-95th.")
+
+def show_habit_emissions():
+    """
+    Emissions per recycled material / cooking appliance, from the decoded list columns
+    """
+    habit = st.selectbox("Compare emissions by household habit", list(HABIT_COLUMNS),
+                         format_func=HABIT_COLUMNS.get)
+    try:
+        habit_emissions = load_habit_emissions(habit)
+    except Exception as e:
+        print(f"Habit emissions unavailable: {str(e)}")
+        habit_emissions = None
+    if habit_emissions is None:
+        st.info("Household habit comparisons need the raw survey file, which is not available here.")
+        return
+
+    habit_plot = go.Figure(
+        go.Bar(
+            x=habit_emissions['category'],
+            y=habit_emissions['mean'],
+            marker_color="#8da0cb",
+            text=[str(int(round(val))) for val in habit_emissions['mean']],
+            textposition='outside'
+        )
+    )
+    habit_plot.update_layout(
+        title=dict(
+            text=f"Average Individual Carbon Emission by {HABIT_COLUMNS[habit]} (Kg/Month)",
+            x=0.5,
+            xanchor="center"
+        ),
+        xaxis_title=HABIT_COLUMNS[habit],
+        yaxis_title="Carbon Emission (Kg/Month)",
+        height=400,
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    st.plotly_chart(habit_plot, use_container_width=True)
 
 def get_locations():
     return ['Collins Street', 'Bourke Street', 'Flinders Street', 'Queen Street', 
@@ -217,180 +328,115 @@ def get_time_slots():
             '1:00 PM', '2:00 PM', '3:00 PM', '4:00 PM', '5:00 PM', '6:00 PM']
 
 
-@st.cache_data
-def get_streets_list():
+@st.cache_resource
+def get_occupancy_history():
     """
-    obtain the list of streets
+    Shared occupancy history, filled by every status poll across all sessions
     """
-    try:
-        print("Fetching street list...")
-        streets_response = requests.get("https://ldr1cwcs34.execute-api.ap-southeast-2.amazonaws.com/streets")
-        print(f"Street API status code: {streets_response.status_code}")
-
-        streets_list = []
-        if streets_response.status_code == 200:
-            streets_data = streets_response.json()
-            print(f"Street API raw response: {streets_data}")
-            print(f"Street data type: {type(streets_data)}")
-
-            # ① Root-level on_street_list
-            if isinstance(streets_data, dict) and 'on_street_list' in streets_data:
-                raw_list = streets_data['on_street_list']
-                # Clean data (remove line breaks and extra spaces)
-                streets_list = [
-                    ' '.join(s.replace('\r', ' ').replace('\n', ' ').split())
-                    for s in raw_list if isinstance(s, str) and s.strip()
-                ]
-                print(f"Parsed from on_street_list, street count: {len(streets_list)}")
-
-            # ② If body exists
-            elif isinstance(streets_data, dict) and 'body' in streets_data:
-                streets_body = streets_data['body']
-                print(f"Street body content: {streets_body}")
-                print(f"Street body type: {type(streets_body)}")
-                try:
-                    if isinstance(streets_body, str):
-                        streets_list = json.loads(streets_body)
-                    else:
-                        streets_list = streets_body
-                    print(f"Method 1 succeeded, street count: {len(streets_list)}")
-                except Exception as e1:
-                    print(f"Method 1 failed: {e1}")
-                    try:
-                        if isinstance(streets_body, str) and '"on street list"' in streets_body:
-                            matches = re.findall(r'"([^"]*street[^"]*)"', streets_body, re.IGNORECASE)
-                            streets_list = [match for match in matches if 'street' in match.lower()]
-                            print(f"Method 2 succeeded, street count: {len(streets_list)}")
-                    except Exception as e2:
-                        print(f"Method 2 failed: {e2}")
-                        print("Failed to parse street list")
-
-            # ③ root is list
-            elif isinstance(streets_data, list):
-                streets_list = streets_data
-                print(f"Directly parsed list, street count: {len(streets_list)}")
-
-            # ④ root is result
-            elif isinstance(streets_data, dict) and 'result' in streets_data:
-                streets_list = streets_data['result']
-                print(f"Parsed from result field, street count: {len(streets_list)}")
+    return OccupancyHistory(get_time_slots(), store=get_analytics_store())
 
-        else:
-            print(f"Street API request failed: {streets_response.status_code} - {streets_response.text}")
 
-        print(streets_list)
-        return streets_list
+@st.cache_resource
+def get_restriction_index():
+    """
+    Shared compiled sign-plate restrictions, each zone parsed once across all sessions
+    """
+    return RestrictionIndex()
 
-    except Exception as e:
-        print(f"Error occurred while retrieving the list of streets: {str(e)}")
-        return []
 
-def get_parking_zones_info(street_name):
+@st.cache_resource
+def get_bay_zone_index():
     """
-    Obtain the parking area information for the specified street
+    Shared bay -> parking zone index, reused by every status poll
     """
-    try:
-        print(f"Fetching parking zones for {street_name}...")
-
-        # Prepare request data
-        request_data = {
-            "on_street_list": [street_name]
-        }
-
-        zones_response = requests.post(
-            "https://ldr1cwcs34.execute-api.ap-southeast-2.amazonaws.com/GetSignPlatesInfo",
-            json=request_data,
-            headers={'Content-Type': 'application/json'},
-            timeout=30
-        )
+    return BayZoneIndex()
 
-        print(f"Zones API status code: {zones_response.status_code}")
-
-        zones_df = pd.DataFrame()
-
-        if zones_response.status_code == 200:
-            zones_data = zones_response.json()
-            print(f"Zones API response type: {type(zones_data)}")
-            print(f"Zones API response content: {zones_data}")
-
-            # Analyze parking area data
-            if isinstance(zones_data, dict) and 'result' in zones_data:
-                zones_df = pd.DataFrame(zones_data['result'])
-                print(f"Number of rows in parking zones data: {len(zones_df)}")
-                if not zones_df.empty:
-                    print(f"Zone data columns: {zones_df.columns.tolist()}")
-                    print("First 10 rows:")
-                    df_display = zones_df.head(10).reset_index(drop=True)
-                    df_display.index = df_display.index + 1
-                    print(df_display)
-
-                    print("\nData summary:")
-                    if 'ParkingZone' in zones_df.columns:
-                        print(f"Number of parking zones: {zones_df['ParkingZone'].nunique()}")
-                    if 'Restriction_Display' in zones_df.columns:
-                        print(f"Restriction type distribution:\n{zones_df['Restriction_Display'].value_counts()}")
-                    if 'Restriction_Days' in zones_df.columns:
-                        print(f"Restriction days distribution:\n{zones_df['Restriction_Days'].value_counts()}")
-            else:
-                print("Invalid Zones API response format")
-        else:
-            print(f"Zones API request failed: {zones_response.status_code} - {zones_response.text}")
 
-        return zones_df
+@st.cache_resource
+def get_bay_location_index():
+    """
+    Shared spatial index over every located CBD bay
+    """
+    return BayLocationIndex()
+
 
-    except Exception as e:
-        print(f"Error while fetching parking zones: {str(e)}")
-        return pd.DataFrame()
+# Tracker key for the status of every CBD street fetched in one request
+ALL_STREETS_KEY = "All CBD streets"
 
 
-def get_parking_status(street_name):
+@st.cache_resource
+def get_status_tracker():
     """
-    Obtain the parking status of the designated street
+    Shared last-known bay status per street, used to diff consecutive polls
     """
-    try:
-        print(f"Fetching parking space status for {street_name}...")
-
-        # Prepare request data
-        request_data = {
-            "on_street_list": [street_name]
-        }
-
-        status_response = requests.post(
-            "https://ldr1cwcs34.execute-api.ap-southeast-2.amazonaws.com/status",
-            json=request_data,
-            headers={'Content-Type': 'application/json'},
-            timeout=30
-        )
+    return StatusTracker()
 
-        print(f"Status API status code: {status_response.status_code}")
 
-        status_df = pd.DataFrame()
+@cached(weight=ANALYTICS_CACHE_WEIGHT, keep=len)
+def get_streets_list():
+    """
+    obtain the list of streets
+    """
+    return data_api.get_streets_list()
 
-        if status_response.status_code == 200:
-            status_data = status_response.json()
-            print(f"Status API response type: {type(status_data)}")
-            print(f"Status API response content: {status_data}")
 
-            if 'result' in status_data:
-                status_df = pd.DataFrame(status_data['result'])
-                print(f"Number of rows in parking status data: {len(status_df)}")
+@cached(ttl=ZONES_CACHE_TTL, dataset="zones", weight=STREET_RESULT_CACHE_WEIGHT, keep=lambda df: not df.empty)
+def get_parking_zones_info(street_name):
+    """
+    Obtain the parking area information for the specified street
+    """
+    return data_api.get_parking_zones_info(street_name)
 
-                if not status_df.empty:
-                    print(f"Status data columns: {status_df.columns.tolist()}")
-                    print("First 10 rows:")
-                    df_display = status_df.head(10).reset_index(drop=True)
-                    df_display.index = df_display.index + 1
-                    print(df_display)
-            else:
-                print("Field 'result' not found in status data")
-        else:
-            print(f"Status API request failed: {status_response.status_code} - {status_response.text}")
 
-        return status_df
+def poll_has_records(poll):
+    return len(poll[1]) > 0
+
+
+@cached(ttl=STATUS_CACHE_TTL, dataset="status", weight=STREET_RESULT_CACHE_WEIGHT, keep=poll_has_records)
+def get_parking_status_records(street_name):
+    """
+    Obtain the raw parking status records of the designated street (or list of streets),
+    with the time they were fetched upstream
+    """
+    return time.time(), data_api.get_parking_status_records(street_name)
+
+
+
+@cached(ttl=60, dataset="status", weight=STREET_RESULT_CACHE_WEIGHT, keep=poll_has_records)
+def get_cbd_parking_status(streets):
+    """
+    Obtain the status records of every street in one request, refreshed at most once a minute
+    """
+    return time.time(), data_api.get_parking_status_records(list(streets))
+
+
+def poll_parking_status(street_key, street_names):
+    """
+    Diff the latest status poll against the last one and feed only the changed bays
+    to the shared indexes; returns the tracker and the delta (delta.fresh is False
+    when the poll came from the status cache and was already applied)
+    """
+    if street_key == ALL_STREETS_KEY:
+        polled_at, status_records = get_cbd_parking_status(tuple(street_names))
+    else:
+        polled_at, status_records = get_parking_status_records(street_names)
+
+    status_tracker = get_status_tracker()
+    delta = status_tracker.apply(street_key, status_records, polled_at)
+    if delta:
+        changed_df = delta.frame()
+        if not changed_df.empty:
+            get_bay_location_index().update(changed_df)
+            get_bay_zone_index().update(changed_df)
+    return status_tracker, delta
+
+def show_stale_warning(api_url, label):
+    """
+    Warn when an endpoint is degraded and its last known data is being shown
+    """
+    if data_api.is_stale(api_url):
+        st.warning(f"{label} is temporarily unavailable. Showing the last known data.")
 
-    except Exception as e:
-        print(f"Error while fetching parking status: {str(e)}")
-        return pd.DataFrame()
 
 # Navigation
 def show_navigation():
@@ -552,22 +598,19 @@ def show_population_vehicle_section():
     try:
         # Obtain  data and display population growth
         population_growth_cbd, regions = get_population_data()
+        show_stale_warning(data_api.POPULATION_GROWTH_URL, "Population data")
 
         # Get hex color codes for population chart
         set2_colors_population = ["#66c2a5", "#fc8d62", "#8da0cb"]
 
         # Create the population growth plot
-        population_growth_plot = go.Figure()
-        for i, region in enumerate(regions):
-            # Plot
-            population_growth_plot.add_trace(go.Scatter(
-                x=population_growth_cbd.index,
-                y=population_growth_cbd[region],
-                mode='lines',
-                stackgroup='one',
-                name=region,
-                line=dict(color=set2_colors_population[i])
-            ))
+        # Stacked traces are downsampled together so they keep the same x values
+        population_growth_plot = go.Figure(time_series_traces(
+            population_growth_cbd.index,
+            {region: population_growth_cbd[region] for region in regions},
+            trace_options={region: dict(mode='lines', stackgroup='one', line=dict(color=set2_colors_population[i]))
+                           for i, region in enumerate(regions)}
+        ))
 
         # Set y-axis to start at zero and go to the max value across all regions
         # For stacked area, y_max should be the max of the row-wise sum (total population per year)
@@ -598,18 +641,17 @@ def show_population_vehicle_section():
         st.plotly_chart(population_growth_plot, use_container_width=True)
 
         years, vic_values = get_vehicle_data()
+        show_stale_warning(data_api.VEHICLE_OWNERSHIP_URL, "Vehicle ownership data")
 
         # Color for vehicle chart
         vehicle_color = "#e78ac3"
 
         # Create vehicle ownership plot
         vehicle_fig = go.Figure()
-        vehicle_fig.add_trace(go.Scatter(
-            x=years,
-            y=vic_values,
-            mode='lines+markers',
-            name='Victoria Vehicle Ownership',
-            line=dict(color=vehicle_color)
+        vehicle_fig.add_traces(time_series_traces(
+            years,
+            {'Victoria Vehicle Ownership': vic_values},
+            trace_options={'Victoria Vehicle Ownership': dict(mode='lines+markers', line=dict(color=vehicle_color))}
         ))
 
         vehicle_fig.update_layout(
@@ -639,6 +681,11 @@ def show_population_vehicle_section():
         st.error(f"Error loading data: {str(e)}")
         st.write("Please check the API connection and data format.")
 
+    try:
+        show_population_projections()
+    except Exception as e:
+        st.error(f"Error computing population projections: {str(e)}")
+
     st.markdown("""
     <div class="insight-box">
         <strong>Key Insight:</strong> The combined trends of population growth in Melbourne CBD and increasing vehicle ownership in Victoria 
@@ -647,6 +694,64 @@ def show_population_vehicle_section():
     """, unsafe_allow_html=True)
 
 
+def show_population_projections():
+    """
+    Growth rates and linear projections for any SA2 region, from the cached analytics
+    (skipped when the raw ABS table is not deployed)
+    """
+    population = load_sa2_population()
+    if population is None:
+        return
+    st.subheader("Growth & Projections")
+    summary = growth_summary(population)
+    regions = list(summary["regions"])
+    default_regions = [region for region in regions if region.startswith("Melbourne CBD")]
+    selected = st.multiselect("Regions", regions, default=default_regions, key="projection_regions")
+
+    colors = ["#66c2a5", "#fc8d62", "#8da0cb", "#e78ac3", "#a6d854", "#ffd92f", "#e5c494", "#b3b3b3"]
+    projection_plot = go.Figure()
+    for i, region in enumerate(selected):
+        row = regions.index(region)
+        color = colors[i % len(colors)]
+        projection_plot.add_traces(time_series_traces(
+            summary["years"],
+            {region: summary["values"][row]},
+            trace_options={region: dict(mode='lines', line=dict(color=color))}
+        ))
+        projection_plot.add_trace(scatter_trace(
+            x=[summary["years"][-1], *summary["projection_years"]],
+            y=[summary["values"][row, -1], *summary["projection"][row]],
+            mode='lines',
+            name=f"{region} (projected)",
+            line=dict(color=color, dash='dash'),
+            showlegend=False
+        ))
+    projection_plot.update_layout(
+        title=dict(
+            text="Population with Linear Projection",
+            x=0.5,
+            xanchor="center"
+        ),
+        xaxis_title="Year",
+        yaxis_title="Population",
+        height=500,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.3,
+            xanchor="center",
+            x=0.5
+        ),
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    st.plotly_chart(projection_plot, use_container_width=True)
+
+    table = growth_table(summary)
+    st.markdown("**Fastest growing regions (CAGR 2001-2021)**")
+    st.dataframe(table.nlargest(10, "CAGR (%)").round(1), use_container_width=True, hide_index=True)
+
+
 # Environmental Impact Section
 def show_environment_section():
     """
@@ -674,50 +779,64 @@ def show_environment_section():
     </div>
     """, unsafe_allow_html=True)
 
+    # Drill-down filters re-aggregate the precomputed cube instead of rescanning the survey
+    emission_filters = show_emission_filters()
+
     try:
         # Obtain environmental data
         carbon_emission_sorted = get_environmental_data()
+        show_stale_warning(data_api.CARBON_EMISSION_URL, "Carbon emission data")
 
-        # Color scheme for carbon emission chart
-        set2_colors = ["#66c2a5", "#fc8d62", "#8da0cb", "#e78ac3", "#a6d854", "#ffd92f", "#e5c494", "#b3b3b3"]
-
-        # Create carbon emission bar chart
-        carbon_emission_plot = go.Figure(
-            go.Bar(
-                x=carbon_emission_sorted['transport'],
-                y=carbon_emission_sorted['carbon_emission'],
-                marker_color=set2_colors[:len(carbon_emission_sorted)],
-                text=[str(int(round(val))) for val in carbon_emission_sorted['carbon_emission']],
-                textposition='outside'
+        if any(emission_filters.values()):
+            carbon_emission_sorted, respondents = get_filtered_emissions(emission_filters)
+            st.caption(f"{respondents:,} survey respondents match the selected filters")
+
+        if carbon_emission_sorted.empty:
+            st.info("No survey respondents match these filters.")
+        else:
+            # Color scheme for carbon emission chart
+            set2_colors = ["#66c2a5", "#fc8d62", "#8da0cb", "#e78ac3", "#a6d854", "#ffd92f", "#e5c494", "#b3b3b3"]
+
+            # Create carbon emission bar chart
+            carbon_emission_plot = go.Figure(
+                go.Bar(
+                    x=carbon_emission_sorted['transport'],
+                    y=carbon_emission_sorted['carbon_emission'],
+                    marker_color=set2_colors[:len(carbon_emission_sorted)],
+                    text=[str(int(round(val))) for val in carbon_emission_sorted['carbon_emission']],
+                    textposition='outside'
+                )
             )
-        )
 
-        carbon_emission_plot.update_layout(
-            title=dict(
-                text="Average Individual Carbon Emission by Transport Type (Kg/Month)",
-                x=0.5,
-                xanchor="center"
-            ),
-            xaxis_title="Transport Type",
-            yaxis_title="Carbon Emission (Kg/Month)",
-            height=500,
-            plot_bgcolor='white',
-            paper_bgcolor='white'
-        )
+            carbon_emission_plot.update_layout(
+                title=dict(
+                    text="Average Individual Carbon Emission by Transport Type (Kg/Month)",
+                    x=0.5,
+                    xanchor="center"
+                ),
+                xaxis_title="Transport Type",
+                yaxis_title="Carbon Emission (Kg/Month)",
+                height=500,
+                plot_bgcolor='white',
+                paper_bgcolor='white'
+            )
 
-        # Modify the toolbar
-        config = {
-            'displayModeBar': True,
-            'modeBarButtonsToRemove': ['resetScale2d', 'resetViewMapbox'],
-            'displaylogo': False
-        }
+            # Modify the toolbar
+            config = {
+                'displayModeBar': True,
+                'modeBarButtonsToRemove': ['resetScale2d', 'resetViewMapbox'],
+                'displaylogo': False
+            }
 
-        st.plotly_chart(carbon_emission_plot, use_container_width=True, config=config)
+            st.plotly_chart(carbon_emission_plot, use_container_width=True, config=config)
 
     except Exception as e:
         st.error(f"Error loading environmental data: {str(e)}")
         st.write("Please check the API connection and data format.")
 
+    show_emission_distribution()
+    show_habit_emissions()
+
     st.markdown("""
     <div class="insight-box">
         <strong>Environmental Insight:</strong> The data reveals significant differences in carbon emissions across transport modes, 
@@ -764,6 +883,18 @@ def show_availability_section():
             st.warning("Unable to obtain street list data")
             return
 
+        view = st.radio("View", ["Street details", "Nearest free bay", "Bay map", "Occupancy heatmap"],
+                        horizontal=True, key="availability_view")
+        if view == "Occupancy heatmap":
+            show_occupancy_heatmap()
+            return
+        if view == "Nearest free bay":
+            show_nearest_free_bays(streets_list)
+            return
+        if view == "Bay map":
+            show_bay_cluster_map(streets_list)
+            return
+
         # Search box (case-insensitive)
         search_input = st.text_input("🔍 Enter street name to search", key="availability_search")
         filtered_streets = []
@@ -800,24 +931,32 @@ def show_availability_section():
 
             # Parking zone information
             zones_df = get_parking_zones_info(confirmed_street)
+            show_stale_warning(data_api.SIGN_PLATES_URL, "Parking zone data")
             if zones_df is not None and not zones_df.empty:
                 st.subheader("Parking Zone Restrictions")
                 try:
                     zones_display = zones_df[['Parkingzone', 'Restriction Days', 'Time Restrictions start',
                                               'Time Restrictions Finish', 'Restriction Display']].copy()
-                    st.dataframe(zones_display, use_container_width=True)
+                    show_paged_table(zones_display, "zones_table")
                 except KeyError:
-                    st.dataframe(zones_df, use_container_width=True)
+                    show_paged_table(zones_df, "zones_table")
+                show_parking_permission(zones_df)
             else:
                 st.warning(f"Unable to obtain parking zone restriction data for {confirmed_street}")
 
             # Parking status information
-            status_df = get_parking_status(confirmed_street)
+            status_tracker, status_delta = poll_parking_status(confirmed_street, confirmed_street)
+            show_stale_warning(data_api.STATUS_URL, "Live parking status")
+            status_df = status_tracker.frame(confirmed_street)
             if status_df is not None and not status_df.empty:
                 st.subheader("Current Parking Space Status")
                 if 'Status_Description' in status_df.columns:
-                    status_summary = status_df['Status_Description'].value_counts().reset_index()
-                    status_summary.columns = ['Status', 'Count']
+                    status_summary = status_tracker.summary(confirmed_street)
+                    # Each upstream poll is recorded once, not once per rerun
+                    if status_delta.fresh:
+                        get_occupancy_history().record_summary(
+                            confirmed_street, status_summary,
+                            datetime.fromtimestamp(status_delta.polled_at, MELBOURNE_TZ))
 
                     color_map = {'Unoccupied': '#22c55e', 'Occupied': '#ef4444', 'Out of Order': '#f59e0b'}
                     status_summary['Color'] = status_summary['Status'].map(lambda x: color_map.get(x, '#6b7280'))
@@ -842,19 +981,22 @@ def show_availability_section():
                         st.plotly_chart(fig, use_container_width=True)
 
                     if 'Parkingzone' in zones_df.columns:
-                        available_zones = zones_df['Parkingzone'].unique().tolist()
+                        zone_counts = get_bay_zone_index().zone_counts(status_df, zones_df['Parkingzone'].unique())
+                        available_zones = zone_counts.loc[zone_counts['Unoccupied'] > 0, 'Parkingzone'].tolist()
                         st.subheader("Available Parking Zones")
                         if available_zones:
                             zones_text = ", ".join(available_zones)
                             st.markdown(f"""
                                 <div style="background-color: #f0f9ff; padding: 1rem; border-radius: 8px; border-left: 4px solid #3b82f6;">
-                                    <strong>Active Zones:</strong> {zones_text}
+                                    <strong>Zones with free bays:</strong> {zones_text}
                                 </div>
                                 """, unsafe_allow_html=True)
                         else:
-                            st.info("No active parking zones found")
+                            st.info("No parking zones with free bays found")
+                        if zone_counts['Total'].sum() > 0:
+                            st.dataframe(zone_counts, use_container_width=True, hide_index=True)
                 else:
-                    st.dataframe(status_df, use_container_width=True)
+                    show_paged_table(status_df, "status_table")
             else:
                 st.warning(f"Unable to obtain parking space status data for {confirmed_street}")
         else:
@@ -876,6 +1018,156 @@ def show_availability_section():
     """, unsafe_allow_html=True)
 
 
+def show_parking_permission(zones_df):
+    """
+    Display which parking zones allow general parking now or at a chosen time
+    """
+    if 'Parkingzone' not in zones_df.columns:
+        return
+
+    restriction_index = get_restriction_index()
+    restriction_index.add_zones(zones_df)
+
+    st.subheader("Can I Park Here?")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        when_option = st.radio("Time", ["Now", "Choose a time"], horizontal=True, key="permission_time")
+    with col2:
+        scope = st.radio("Zones", ["This street", "All loaded CBD zones"], horizontal=True, key="permission_scope")
+
+    when = datetime.now(MELBOURNE_TZ)
+    if when_option == "Choose a time":
+        with col3:
+            chosen_date = st.date_input("Date", value=when.date(), key="permission_date")
+            chosen_time = st.time_input("Time of day", value=when.time().replace(second=0, microsecond=0),
+                                        key="permission_clock")
+        when = datetime.combine(chosen_date, chosen_time, tzinfo=MELBOURNE_TZ)
+
+    zones = None if scope == "All loaded CBD zones" else zones_df['Parkingzone'].unique().tolist()
+    permission_df = restriction_index.evaluate(when, zones)
+    if permission_df.empty:
+        st.info("No restriction data could be interpreted for these zones")
+        return
+
+    allowed = int(permission_df['Can Park'].sum())
+    st.write(f"{allowed} of {len(permission_df)} zones allow general parking at {when.strftime('%a %d %b %H:%M')}")
+    st.dataframe(permission_df, use_container_width=True)
+
+
+def show_nearest_free_bays(streets_list):
+    """
+    Display the unoccupied bays closest to a given point, across all CBD streets
+    """
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        latitude = st.number_input("Latitude", value=CBD_LATITUDE, format="%.5f", key="nearest_lat")
+    with col2:
+        longitude = st.number_input("Longitude", value=CBD_LONGITUDE, format="%.5f", key="nearest_lon")
+    with col3:
+        k = st.slider("Number of bays", 1, 20, 5, key="nearest_k")
+
+    poll_parking_status(ALL_STREETS_KEY, streets_list)
+    bay_location_index = get_bay_location_index()
+
+    if not len(bay_location_index):
+        st.warning("The parking status data does not include bay locations")
+        return
+
+    nearest_df = bay_location_index.nearest_free(latitude, longitude, k=k)
+    if nearest_df.empty:
+        st.info("No free bays found within 2 km of this point")
+        return
+
+    st.subheader("Closest Free Bays")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.dataframe(nearest_df, use_container_width=True, hide_index=True)
+    with col2:
+        st.map(nearest_df.rename(columns={'Latitude': 'lat', 'Longitude': 'lon'}), zoom=15)
+
+
+def show_bay_cluster_map(streets_list):
+    """
+    Display bay occupancy on a map, clustered on the server for the visible area
+    """
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        latitude = st.number_input("Map centre latitude", value=CBD_LATITUDE, format="%.5f", key="map_lat")
+    with col2:
+        longitude = st.number_input("Map centre longitude", value=CBD_LONGITUDE, format="%.5f", key="map_lon")
+    with col3:
+        zoom = st.slider("Zoom", 12, 18, 15, key="map_zoom")
+
+    poll_parking_status(ALL_STREETS_KEY, streets_list)
+    bay_location_index = get_bay_location_index()
+
+    map_height = 600
+    clusters_df = bay_location_index.clusters(zoom, viewport_bounds(latitude, longitude, zoom, height=map_height))
+    if clusters_df.empty:
+        st.info("No located bays in this area")
+        return
+
+    free_share = clusters_df['Free'] / clusters_df['Total']
+    fig = go.Figure(go.Scattermapbox(
+        lat=clusters_df['Latitude'],
+        lon=clusters_df['Longitude'],
+        mode='markers+text',
+        marker=dict(
+            size=(clusters_df['Total'] ** 0.5 * 6).clip(8, 60),
+            color=free_share,
+            colorscale=[[0, '#ef4444'], [0.5, '#f59e0b'], [1, '#22c55e']],
+            cmin=0, cmax=1,
+            colorbar=dict(title="Free share")
+        ),
+        text=clusters_df['Free'].astype(str),
+        customdata=clusters_df[['Free', 'Total']],
+        hovertemplate="%{customdata[0]} of %{customdata[1]} bays free<extra></extra>"
+    ))
+    fig.update_layout(
+        mapbox=dict(style='open-street-map', center=dict(lat=latitude, lon=longitude), zoom=zoom),
+        height=map_height,
+        margin=dict(l=0, r=0, t=0, b=0)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.write(f"{int(clusters_df['Free'].sum())} of {int(clusters_df['Total'].sum())} bays in view are free")
+
+
+def show_occupancy_heatmap():
+    """
+    Display the occupancy rate per street and time slot from the recorded status history
+    """
+    day_options = ["All days"] + WEEKDAYS
+    selected_day = st.selectbox("Day of week", day_options, key="heatmap_day")
+    weekday = None if selected_day == "All days" else WEEKDAYS.index(selected_day)
+
+    heatmap_df = get_occupancy_history().heatmap(weekday).dropna(how='all')
+    if heatmap_df.empty:
+        st.info("No occupancy history recorded yet. Confirm a street to start recording its status.")
+        return
+
+    fig = go.Figure(data=go.Heatmap(
+        z=heatmap_df.values,
+        x=heatmap_df.columns,
+        y=heatmap_df.index,
+        colorscale='RdYlGn_r',
+        zmin=0, zmax=100,
+        colorbar=dict(title="Occupied %"),
+        hovertemplate="%{y}<br>%{x}: %{z:.0f}% occupied<extra></extra>"
+    ))
+    fig.update_layout(
+        title=dict(text="Occupancy Rate by Street and Time", x=0.5, xanchor="center"),
+        xaxis_title="Time Slot",
+        height=max(400, 30 * len(heatmap_df) + 150),
+        plot_bgcolor='white', paper_bgcolor='white'
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Drill down into one street's recorded polls with an indexed store query
+    street = st.selectbox("Hourly occupancy for street", list(heatmap_df.index), key="heatmap_street")
+    street_rates = get_analytics_store().occupancy_rate(street, weekday)
+    if not street_rates.empty:
+        st.bar_chart(street_rates.set_index("hour")["occupancy_rate"])
+
 
 # Main application logic
 def main():
@@ -902,6 +1194,12 @@ def main():
         if st.button("🌱 Emission", use_container_width=True):
             st.session_state.page = 'environment'
             st.rerun()
+
+        with st.expander("Cache statistics"):
+            cache_stats = shared_cache.stats()
+            st.write(f"{cache_stats['used_bytes'] / 1e6:.1f} of {cache_stats['budget_bytes'] / 1e6:.0f} MB, "
+                     f"{cache_stats['entries']} entries, {cache_stats['evictions']} evictions")
+            st.json(cache_stats['datasets'])
             
 
     # Show navigation bar
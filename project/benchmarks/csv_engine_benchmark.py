@@ -0,0 +1,93 @@
+"""
+Compare CSV engines (c, pyarrow) with and without declared dtypes/usecols on the
+bundled population and carbon emission tables scaled up 100x, and report the
+fastest configuration per file shape.
+
+Run from the project folder:
+    python benchmarks/csv_engine_benchmark.py [scale]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from csv_reader import FILE_DTYPES, HAVE_PYARROW  # noqa: E402
+from population_analytics import HEADER_ROWS, SA2_ID_COLUMNS  # noqa: E402
+
+import pandas as pd  # noqa: E402
+
+SCALE = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+REPEATS = 3
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static_graphs")
+
+POPULATION_YEARS = [str(year) for year in range(2001, 2022)]
+
+
+def scaled_population(directory):
+    """
+    The SA2 rows of the ABS table (without its preamble and footnotes) repeated SCALE times
+    """
+    with open(os.path.join(STATIC_DIR, "population_growth_raw.csv"), encoding="utf-8-sig") as source:
+        lines = source.read().splitlines()[HEADER_ROWS:]
+    rows = [line for line in lines if line.split(",", 9)[8:9] not in ([], [""])]
+    header = ",".join(SA2_ID_COLUMNS + POPULATION_YEARS + [f"extra_{i}" for i in range(6)])
+    path = os.path.join(directory, "population_growth_scaled.csv")
+    with open(path, "w") as target:
+        target.write(header + "\n")
+        for _ in range(SCALE):
+            target.write("\n".join(rows) + "\n")
+    return path
+
+
+def scaled_emission(directory):
+    with open(os.path.join(STATIC_DIR, "carbon_emission_raw.csv")) as source:
+        header, *rows = source.read().splitlines()
+    path = os.path.join(directory, "carbon_emission_scaled.csv")
+    with open(path, "w") as target:
+        target.write(header + "\n")
+        for _ in range(SCALE):
+            target.write("\n".join(rows) + "\n")
+    return path
+
+
+def time_read(path, **options):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        frame = pd.read_csv(path, **options)
+        best = min(best, time.perf_counter() - start)
+    return best, len(frame)
+
+
+def configurations(usecols, dtype):
+    engines = ["c", "pyarrow"] if HAVE_PYARROW else ["c"]
+    for engine in engines:
+        yield f"{engine}", {"engine": engine}
+        yield f"{engine} +dtype/usecols", {"engine": engine, "usecols": usecols, "dtype": dtype}
+
+
+if __name__ == "__main__":
+    if not HAVE_PYARROW:
+        print("pyarrow is not installed; only the c engine is measured")
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = [
+            ("population (wide numeric)", scaled_population(directory),
+             ["SA2 name"] + POPULATION_YEARS, {year: "float64" for year in POPULATION_YEARS}),
+            ("emission (mixed text)", scaled_emission(directory),
+             ["Transport", "Vehicle Type", "Vehicle Monthly Distance Km", "CarbonEmission"],
+             {column: kind for column, kind in FILE_DTYPES["carbon_emission_raw.csv"].items()
+              if column in ("Vehicle Monthly Distance Km", "CarbonEmission")}),
+        ]
+
+        print(f"{'file':>26} {'configuration':>22} {'rows':>10} {'seconds':>9}")
+        for label, path, usecols, dtype in files:
+            results = []
+            for name, options in configurations(usecols, dtype):
+                seconds, rows = time_read(path, **options)
+                results.append((seconds, name))
+                print(f"{label:>26} {name:>22} {rows:>10} {seconds:>9.3f}")
+            seconds, name = min(results)
+            print(f"{label:>26} {'fastest: ' + name:>22}")
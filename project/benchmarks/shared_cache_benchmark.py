@@ -0,0 +1,60 @@
+"""
+Compare the per-hit cost of st.cache_data style caching (pickle round trip on
+every hit) with the shared cache, which hands out read-only views of one
+frozen frame, for frames shaped like the population dataset.
+
+Run from the project folder:
+    python benchmarks/shared_cache_benchmark.py
+"""
+import os
+import pickle
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared_cache import SharedCache  # noqa: E402
+
+HITS = 100
+
+
+def make_frame(rows):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.integers(0, 50000, size=(rows, 21)), columns=[str(year) for year in range(2001, 2022)])
+    frame.insert(0, "region", [f"Region {i}" for i in range(rows)])
+    return frame
+
+
+def pickled_hits(frame):
+    # What st.cache_data does for every hit: return a fresh unpickled copy
+    stored = pickle.dumps(frame)
+    return [pickle.loads(stored) for _ in range(HITS)]
+
+
+def shared_hits(frame):
+    cache = SharedCache()
+    return [cache.get_or_load("population", lambda: frame) for _ in range(HITS)]
+
+
+def measure(hit_fn, frame):
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = hit_fn(frame)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return elapsed / HITS * 1e6, peak / 1e6
+
+
+if __name__ == "__main__":
+    print(f"{'rows':>8} {'strategy':>10} {'us/hit':>10} {'peak MB':>10}")
+    for rows in (5, 2470, 24700):
+        frame = make_frame(rows)
+        for name, hit_fn in (("pickle", pickled_hits), ("shared", shared_hits)):
+            per_hit, peak = measure(hit_fn, frame)
+            print(f"{rows:>8} {name:>10} {per_hit:>10.1f} {peak:>10.1f}")
@@ -0,0 +1,167 @@
+import abc
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Seconds between sweeps of expired rows in the SQLite backend
+SQLITE_PURGE_INTERVAL = 300
+
+
+class CacheBackend(abc.ABC):
+    """
+    Byte store shared between processes, used as the second level of the shared cache.
+
+    The interface is the GET/SETEX/DEL subset of Redis, so a Redis client (or a
+    local stand-in) can implement it directly.
+    """
+
+    @abc.abstractmethod
+    def get(self, key):
+        """
+        Stored bytes for key, or None when missing or expired
+        """
+
+    @abc.abstractmethod
+    def set(self, key, value, ttl=None):
+        """
+        Store bytes for key, expiring after ttl seconds (None = never)
+        """
+
+    @abc.abstractmethod
+    def delete(self, key):
+        """
+        Remove key if present
+        """
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process stand-in for Redis, for a single process or for trying the backend path
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._values.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires is not None and expires <= time.time():
+                del self._values[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._values[key] = (value, None if ttl is None else time.time() + ttl)
+
+    def delete(self, key):
+        with self._lock:
+            self._values.pop(key, None)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Cache in a SQLite file, shared by every process on the host that opens the same path.
+
+    WAL mode lets readers in other replicas proceed while one replica writes.
+    Expired rows are skipped on reads and swept at most every purge_interval seconds.
+    """
+
+    def __init__(self, path, purge_interval=SQLITE_PURGE_INTERVAL):
+        self.path = path
+        self.purge_interval = purge_interval
+        self._next_purge = time.time() + purge_interval
+        self._purge_lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)")
+
+    def _connection(self):
+        # sqlite3 connections must not be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA busy_timeout=5000")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)", (key, time.time())
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def set(self, key, value, ttl=None):
+        expires = None if ttl is None else time.time() + ttl
+        with self._connection() as connection:
+            connection.execute("INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                               (key, sqlite3.Binary(value), expires))
+        self._purge_if_due()
+
+    def _purge_if_due(self):
+        now = time.time()
+        with self._purge_lock:
+            if now < self._next_purge:
+                return
+            self._next_purge = now + self.purge_interval
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache WHERE expires <= ?", (now,))
+
+    def delete(self, key):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache in a Redis server (requires the optional redis package)
+    """
+
+    def __init__(self, url):
+        if redis is None:
+            raise ImportError("The redis package is required for a redis:// cache backend")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, value, ttl=None):
+        if ttl is None:
+            self._client.set(key, value)
+        else:
+            self._client.setex(key, max(int(ttl), 1), value)
+
+    def delete(self, key):
+        self._client.delete(key)
+
+
+def backend_from_url(url):
+    """
+    Create a backend from a DASHBOARD_CACHE_BACKEND value: 'sqlite:///path/to/cache.db',
+    'redis://host:6379/0' or 'memory'; None or '' for no backend
+    """
+    if not url:
+        return None
+    if url == "memory":
+        return MemoryCacheBackend()
+    if url.startswith("sqlite:///"):
+        return SQLiteCacheBackend(url[len("sqlite:///"):])
+    if url.startswith("redis://"):
+        return RedisCacheBackend(url)
+    raise ValueError(f"Unsupported cache backend: {url}")
@@ -0,0 +1,93 @@
+import numpy as np
+import plotly.graph_objects as go
+
+# Traces with more points than this are drawn with WebGL (Scattergl) instead of SVG
+WEBGL_POINT_THRESHOLD = 1000
+
+# Approximate plot width in pixels; series are downsampled to one point per pixel
+CHART_PIXEL_WIDTH = 1200
+
+
+def _positions(x):
+    """
+    Numeric x positions for downsampling (category/string axes use their order)
+    """
+    values = np.asarray(x)
+    if np.issubdtype(values.dtype, np.number):
+        return values.astype(float)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return np.arange(len(values), dtype=float)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept; each of the n_out - 2 buckets in
+    between keeps the point forming the largest triangle with the previously kept
+    point and the mean of the next bucket, which preserves peaks and troughs.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _positions(x)
+    y = np.asarray(y, dtype=float)
+
+    # Bucket boundaries over the interior points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Mean of every bucket (the last "next bucket" is the final point)
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(np.nan_to_num(y[1:n - 1]), edges[:-1] - 1)
+    sizes = np.diff(edges)
+    means_x = np.append(sums_x / sizes, x[-1])
+    means_y = np.append(sums_y / sizes, np.nan_to_num(y[-1]))
+
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        bx, by = x[start:stop], np.nan_to_num(y[start:stop])
+        # Twice the triangle area for every candidate in the bucket
+        areas = np.abs((x[previous] - means_x[bucket + 1]) * (by - y[previous])
+                       - (x[previous] - bx) * (means_y[bucket + 1] - y[previous]))
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def downsample(x, ys, max_points=CHART_PIXEL_WIDTH):
+    """
+    Downsample one or more series sharing an x axis with LTTB on their total, so
+    stacked traces keep identical x values.
+
+    Returns the kept x values and the list of kept y arrays.
+    """
+    ys = [np.asarray(y, dtype=float) for y in ys]
+    indices = lttb_indices(x, np.nansum(ys, axis=0), max_points)
+    return np.asarray(x)[indices], [y[indices] for y in ys]
+
+
+def scatter_trace(x, y, **trace_options):
+    """
+    go.Scatter for small series, go.Scattergl above WEBGL_POINT_THRESHOLD points.
+
+    stackgroup is SVG-only in Plotly, so stacked traces always stay go.Scatter.
+    """
+    if len(y) > WEBGL_POINT_THRESHOLD and "stackgroup" not in trace_options:
+        return go.Scattergl(x=x, y=y, **trace_options)
+    return go.Scatter(x=x, y=y, **trace_options)
+
+
+def time_series_traces(x, series, max_points=CHART_PIXEL_WIDTH, trace_options=None):
+    """
+    Downsampled traces for several series over the same x values.
+
+    series: {name: y values}; trace_options: {name: extra trace keyword arguments}.
+    """
+    trace_options = trace_options or {}
+    names = list(series)
+    kept_x, kept_ys = downsample(x, [series[name] for name in names], max_points)
+    return [scatter_trace(kept_x, kept_y, name=name, **trace_options.get(name, {}))
+            for name, kept_y in zip(names, kept_ys)]
@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Last good responses kept per breaker (one per distinct request); the least recently used go first
+MAX_FALLBACKS = 256
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised when an endpoint's circuit is open and no last-known-good result exists
+    """
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker with a last-known-good fallback.
+
+    Errors, 5xx/429 responses and responses slower than slow_call_seconds count
+    as failures. After failure_threshold consecutive failures the circuit opens:
+    calls return the last good response for the same request immediately (and
+    the breaker reports itself as stale) while a background probe retries the
+    endpoint every open_seconds. A successful probe closes the circuit again.
+
+    Only 2xx and 304 responses are kept as fallbacks, at most max_fallbacks of them.
+    """
+
+    def __init__(self, name, failure_threshold=3, slow_call_seconds=5.0, open_seconds=30.0,
+                 max_fallbacks=MAX_FALLBACKS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self.max_fallbacks = max_fallbacks
+        self._last_good = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def _is_failure(self, response, elapsed):
+        status_code = getattr(response, "status_code", 200)
+        return status_code >= 500 or status_code == 429 or elapsed > self.slow_call_seconds
+
+    def _attempt(self, key, fn):
+        start = time.monotonic()
+        try:
+            response = fn()
+        except Exception:
+            self._record(False)
+            raise
+
+        ok = not self._is_failure(response, time.monotonic() - start)
+        self._record(ok)
+        status_code = getattr(response, "status_code", 200)
+        # A 4xx is not an outage, but it is no answer worth falling back on either
+        if ok and (200 <= status_code < 300 or status_code == 304):
+            with self._lock:
+                self._last_good[key] = response
+                self._last_good.move_to_end(key)
+                while len(self._last_good) > self.max_fallbacks:
+                    self._last_good.popitem(last=False)
+        return response
+
+    def _record(self, ok):
+        with self._lock:
+            if ok:
+                if self.opened_at is not None:
+                    print(f"Circuit for {self.name} closed")
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                if self.failures >= self.failure_threshold and self.opened_at is None:
+                    print(f"Circuit for {self.name} opened after {self.failures} failures")
+                    self.opened_at = time.monotonic()
+
+    def _probe(self, key, fn):
+        try:
+            self._attempt(key, fn)
+        except Exception as e:
+            print(f"Probe of {self.name} failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._probing = False
+                if self.opened_at is not None:
+                    # Wait another full interval before the next probe
+                    self.opened_at = time.monotonic()
+
+    def call(self, key, fn):
+        """
+        Run fn (an upstream request) unless the circuit is open
+        """
+        with self._lock:
+            is_open = self.opened_at is not None
+            start_probe = is_open and not self._probing and \
+                time.monotonic() - self.opened_at >= self.open_seconds
+            if start_probe:
+                self._probing = True
+            fallback = self._last_good.get(key)
+            if fallback is not None:
+                self._last_good.move_to_end(key)
+
+        if not is_open:
+            return self._attempt(key, fn)
+
+        if start_probe:
+            threading.Thread(target=self._probe, args=(key, fn), daemon=True).start()
+        if fallback is None:
+            raise CircuitOpenError(f"{self.name} is unavailable")
+        return fallback
+
+    def health(self):
+        with self._lock:
+            return {
+                "endpoint": self.name,
+                "state": "open" if self.opened_at is not None else "closed",
+                "consecutive_failures": self.failures,
+                "stale": self.opened_at is not None,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """
+    The shared breaker for an endpoint, created on first use
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def breaker_health():
+    """
+    State of every endpoint's breaker
+    """
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [breaker.health() for breaker in breakers]
@@ -0,0 +1,63 @@
+"""
+Write precompressed .gz (and .br when the brotli package is installed) siblings
+for the text assets in dist/, for api_server.py to serve.
+
+Run with:
+    python compress_assets.py [dist_dir]
+"""
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DIST_DIR = os.path.join(os.path.dirname(__file__), "dist")
+
+COMPRESSIBLE_EXTENSIONS = {".html", ".js", ".css", ".svg", ".json", ".txt", ".map"}
+# Files smaller than this gain nothing from compression
+MIN_SIZE = 1024
+
+
+def compress_file(file_path):
+    """
+    Write the compressed variants of one file, returning the names written
+    """
+    with open(file_path, "rb") as f:
+        content = f.read()
+
+    variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(content, quality=11)
+
+    written = []
+    for suffix, compressed in variants.items():
+        # Keep a variant only if it is actually smaller
+        if len(compressed) < len(content):
+            with open(file_path + suffix, "wb") as f:
+                f.write(compressed)
+            written.append(os.path.basename(file_path) + suffix)
+    return written
+
+
+def compress_assets(dist_dir=DIST_DIR):
+    """
+    Compress every eligible file under dist_dir
+    """
+    written = []
+    for root, _, files in os.walk(dist_dir):
+        for name in files:
+            file_path = os.path.join(root, name)
+            if os.path.splitext(name)[1] in COMPRESSIBLE_EXTENSIONS and os.path.getsize(file_path) >= MIN_SIZE:
+                written.extend(compress_file(file_path))
+    return written
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else DIST_DIR
+    if brotli is None:
+        print("brotli is not installed, only writing .gz files")
+    for name in compress_assets(target):
+        print(f"Wrote {name}")
@@ -0,0 +1,80 @@
+import importlib.util
+import os
+
+import pandas as pd
+
+HAVE_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+# Engine for every CSV load: auto (pyarrow when installed and the options allow it), pyarrow, c or python
+DEFAULT_ENGINE = os.environ.get("DASHBOARD_CSV_ENGINE", "auto")
+
+# read_csv options the multithreaded pyarrow engine does not support
+PYARROW_UNSUPPORTED = {"chunksize", "iterator", "nrows", "skipfooter", "thousands", "low_memory",
+                       "converters", "comment", "on_bad_lines"}
+
+# Declared dtypes of the bundled files (by file name), so no engine has to infer them;
+# text columns are left to the engine
+FILE_DTYPES = {
+    "carbon_emission_raw.csv": {
+        "Monthly Grocery Bill": "int32",
+        "Vehicle Monthly Distance Km": "int32",
+        "Waste Bag Weekly Count": "int32",
+        "How Long TV PC Daily Hour": "int32",
+        "How Many New Clothes Monthly": "int32",
+        "How Long Internet Daily Hour": "int32",
+        "CarbonEmission": "int32",
+    },
+    "carbon_emission_clean.csv": {"carbon_emission": "float64"},
+    "vehicle_ownership_clean.csv": {str(year): "float64" for year in range(2016, 2021)},
+}
+
+
+# Files pyarrow failed to parse, read with the c engine from then on
+_pyarrow_failures = set()
+
+
+def resolve_engine(engine=None, options=None):
+    """
+    The engine to use for a read: pyarrow only when installed and every option is supported
+    """
+    engine = engine or DEFAULT_ENGINE
+    options = options or {}
+    # The pyarrow engine only selects columns by name
+    positional_usecols = options.get("header", "infer") is None and options.get("usecols") is not None
+    pyarrow_ok = HAVE_PYARROW and not PYARROW_UNSUPPORTED.intersection(options) and not positional_usecols
+    if engine == "auto":
+        return "pyarrow" if pyarrow_ok else "c"
+    if engine == "pyarrow" and not pyarrow_ok:
+        return "c"
+    return engine
+
+
+def read_csv(file_path, engine=None, **options):
+    """
+    pd.read_csv through the configured engine, with the file's declared dtypes.
+
+    Declared dtypes are limited to usecols when given; explicit dtype options win.
+    Files the pyarrow engine cannot parse are read again with the c engine.
+    """
+    dtype = dict(FILE_DTYPES.get(os.path.basename(file_path), {}))
+    usecols = options.get("usecols")
+    if usecols is not None and not callable(usecols):
+        dtype = {column: kind for column, kind in dtype.items() if column in usecols}
+    if options.get("header", "infer") is None:
+        # Positional columns cannot match declared names
+        dtype = {}
+    dtype.update(options.pop("dtype", None) or {})
+    if dtype:
+        options["dtype"] = dtype
+    engine = resolve_engine(engine, options)
+    if engine == "pyarrow" and file_path in _pyarrow_failures:
+        engine = "c"
+    if engine == "pyarrow":
+        try:
+            return pd.read_csv(file_path, engine="pyarrow", **options)
+        except (ValueError, TypeError) as e:
+            # pyarrow rejects ragged rows (e.g. footnotes in the ABS tables) that the c parser accepts
+            print(f"pyarrow could not parse {os.path.basename(file_path)}, using the c engine: {str(e)}")
+            _pyarrow_failures.add(file_path)
+            engine = "c"
+    return pd.read_csv(file_path, engine=engine, **options)
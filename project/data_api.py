@@ -0,0 +1,263 @@
+import hashlib
+import json
+import threading
+
+import pandas as pd
+import requests
+
+from circuit_breaker import breaker_health, get_breaker
+from single_flight import coalesced
+from street_catalog import StreetCatalog
+
+API_BASE_URL = "https://ldr1cwcs34.execute-api.ap-southeast-2.amazonaws.com"
+POPULATION_GROWTH_URL = f"{API_BASE_URL}/getPopulationGrowth"
+VEHICLE_OWNERSHIP_URL = f"{API_BASE_URL}/getVehicleOwnership"
+CARBON_EMISSION_URL = f"{API_BASE_URL}/getCarbonEmission"
+STREETS_URL = f"{API_BASE_URL}/streets"
+SIGN_PLATES_URL = f"{API_BASE_URL}/GetSignPlatesInfo"
+STATUS_URL = f"{API_BASE_URL}/status"
+
+# Seconds to wait for the analytics datasets and the parking endpoints
+DATASET_TIMEOUT = 10
+PARKING_TIMEOUT = 30
+
+
+def guarded_get(url, headers=None, timeout=DATASET_TIMEOUT):
+    """
+    GET through the endpoint's circuit breaker
+    """
+    return get_breaker(url).call(url, lambda: requests.get(url, headers=headers, timeout=timeout))
+
+
+def guarded_post(url, request_data, timeout=PARKING_TIMEOUT):
+    """
+    POST JSON through the endpoint's circuit breaker; the last good response is
+    kept per request body
+    """
+    key = json.dumps(request_data, sort_keys=True)
+    return get_breaker(url).call(key, lambda: requests.post(
+        url,
+        json=request_data,
+        headers={'Content-Type': 'application/json'},
+        timeout=timeout
+    ))
+
+
+def upstream_health():
+    """
+    Circuit breaker state per endpoint; 'stale' means cached results are being served
+    """
+    return breaker_health()
+
+
+def is_stale(url):
+    """
+    Whether results from this endpoint are currently last-known-good fallbacks
+    """
+    return get_breaker(url).is_open
+
+
+# Last downloaded version of each dataset: its validators, content hash and DataFrame
+_dataset_versions = {}
+_dataset_lock = threading.Lock()
+
+
+@coalesced("GET")
+def get_dataset(api_url):
+    """
+    Fetch a dataset (a list of dicts) from Lambda/API Gateway as a DataFrame.
+
+    The request is conditional on the ETag/Last-Modified of the last download. On a
+    304, or a body with the same content hash, the previous DataFrame is returned
+    without decoding the JSON again. Other non-2xx responses also return the previous
+    DataFrame (or raise when there is none) and never replace it.
+    """
+    with _dataset_lock:
+        version = _dataset_versions.get(api_url)
+
+    headers = {}
+    if version is not None:
+        if version["etag"]:
+            headers["If-None-Match"] = version["etag"]
+        if version["last_modified"]:
+            headers["If-Modified-Since"] = version["last_modified"]
+
+    # Fetch data from Lambda/API Gateway
+    try:
+        response = guarded_get(api_url, headers=headers)
+    except Exception as e:
+        if version is None:
+            raise
+        print(f"Serving last downloaded {api_url}: {str(e)}")
+        return version["frame"]
+    if version is not None and response.status_code == 304:
+        return version["frame"]
+    if not 200 <= response.status_code < 300:
+        # Error bodies are never decoded or kept; the last good download stays current
+        if version is None:
+            raise requests.HTTPError(f"{api_url} returned {response.status_code}", response=response)
+        print(f"Serving last downloaded {api_url}: status {response.status_code}")
+        return version["frame"]
+
+    content_hash = hashlib.sha256(response.content).hexdigest()
+    if version is not None and content_hash == version["content_hash"]:
+        frame = version["frame"]
+    else:
+        data = response.json()  # Should be a list of dicts
+        frame = pd.DataFrame(data)
+
+    with _dataset_lock:
+        _dataset_versions[api_url] = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_hash": content_hash,
+            "frame": frame,
+        }
+    return frame
+
+
+def get_population_growth(api_url=POPULATION_GROWTH_URL):
+    """
+    Obtain the population growth data for all regions
+    """
+    return get_dataset(api_url)
+
+
+def get_vehicle_ownership(api_url=VEHICLE_OWNERSHIP_URL):
+    """
+    Obtain the vehicle ownership data for all states
+    """
+    return get_dataset(api_url)
+
+
+def get_carbon_emission(api_url=CARBON_EMISSION_URL):
+    """
+    Obtain the average carbon emission per transport type
+    """
+    return get_dataset(api_url)
+
+
+# Last /streets catalog, refreshed conditionally on its ETag
+_street_catalog = StreetCatalog()
+
+
+@coalesced(STREETS_URL)
+def get_streets_list():
+    """
+    obtain the list of streets
+    """
+    try:
+        print("Fetching street list...")
+        headers = {"If-None-Match": _street_catalog.etag} if _street_catalog.etag else None
+        streets_response = guarded_get(STREETS_URL, headers=headers)
+        print(f"Street API status code: {streets_response.status_code}")
+
+        if streets_response.status_code == 304:
+            return list(_street_catalog.names)
+        if streets_response.status_code == 200:
+            return list(_street_catalog.refresh(streets_response.content, streets_response.headers.get("ETag")))
+
+        print(f"Street API request failed: {streets_response.status_code} - {streets_response.text}")
+        return []
+
+    except Exception as e:
+        print(f"Error occurred while retrieving the list of streets: {str(e)}")
+        return []
+
+@coalesced(SIGN_PLATES_URL)
+def get_parking_zones_info(street_name):
+    """
+    Obtain the parking area information for the specified street
+    """
+    try:
+        print(f"Fetching parking zones for {street_name}...")
+
+        # Prepare request data
+        request_data = {
+            "on_street_list": [street_name]
+        }
+
+        zones_response = guarded_post(SIGN_PLATES_URL, request_data)
+
+        print(f"Zones API status code: {zones_response.status_code}")
+
+        zones_df = pd.DataFrame()
+
+        if zones_response.status_code == 200:
+            zones_data = zones_response.json()
+            print(f"Zones API response type: {type(zones_data)}")
+            print(f"Zones API response content: {zones_data}")
+
+            # Analyze parking area data
+            if isinstance(zones_data, dict) and 'result' in zones_data:
+                zones_df = pd.DataFrame(zones_data['result'])
+                print(f"Number of rows in parking zones data: {len(zones_df)}")
+                if not zones_df.empty:
+                    print(f"Zone data columns: {zones_df.columns.tolist()}")
+                    print("First 10 rows:")
+                    df_display = zones_df.head(10).reset_index(drop=True)
+                    df_display.index = df_display.index + 1
+                    print(df_display)
+
+                    print("\nData summary:")
+                    if 'ParkingZone' in zones_df.columns:
+                        print(f"Number of parking zones: {zones_df['ParkingZone'].nunique()}")
+                    if 'Restriction_Display' in zones_df.columns:
+                        print(f"Restriction type distribution:\n{zones_df['Restriction_Display'].value_counts()}")
+                    if 'Restriction_Days' in zones_df.columns:
+                        print(f"Restriction days distribution:\n{zones_df['Restriction_Days'].value_counts()}")
+            else:
+                print("Invalid Zones API response format")
+        else:
+            print(f"Zones API request failed: {zones_response.status_code} - {zones_response.text}")
+
+        return zones_df
+
+    except Exception as e:
+        print(f"Error while fetching parking zones: {str(e)}")
+        return pd.DataFrame()
+
+
+@coalesced(STATUS_URL)
+def get_parking_status_records(street_name):
+    """
+    Obtain the raw parking status records of the designated street (or list of streets)
+    """
+    try:
+        print(f"Fetching parking space status for {street_name}...")
+
+        # Prepare request data
+        request_data = {
+            "on_street_list": street_name if isinstance(street_name, list) else [street_name]
+        }
+
+        status_response = guarded_post(STATUS_URL, request_data)
+
+        print(f"Status API status code: {status_response.status_code}")
+
+        status_records = []
+
+        if status_response.status_code == 200:
+            status_data = status_response.json()
+            print(f"Status API response type: {type(status_data)}")
+
+            if 'result' in status_data:
+                status_records = status_data['result']
+                print(f"Number of rows in parking status data: {len(status_records)}")
+            else:
+                print("Field 'result' not found in status data")
+        else:
+            print(f"Status API request failed: {status_response.status_code} - {status_response.text}")
+
+        return status_records
+
+    except Exception as e:
+        print(f"Error while fetching parking status: {str(e)}")
+        return []
+
+
+def get_parking_status(street_name):
+    """
+    Obtain the parking status of the designated street as a DataFrame
+    """
+    return pd.DataFrame(get_parking_status_records(street_name))
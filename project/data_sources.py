@@ -0,0 +1,156 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import data_api
+from csv_reader import read_csv
+from shared_cache import shared_cache
+
+# Which source the dashboard reads its analytics datasets from: api, csv or mock
+DEFAULT_SOURCE = os.environ.get("DASHBOARD_DATA_SOURCE", "api")
+
+# Directory with the cleaned CSV snapshots (and optional .parquet copies)
+SNAPSHOT_DIR = os.environ.get("DASHBOARD_SNAPSHOT_DIR",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), "static_graphs"))
+
+# Datasets every source provides, with the API endpoint and snapshot file for each
+DATASETS = {
+    "population_growth": (data_api.POPULATION_GROWTH_URL, "population_growth_clean"),
+    "vehicle_ownership": (data_api.VEHICLE_OWNERSHIP_URL, "vehicle_ownership_clean"),
+    "carbon_emission": (data_api.CARBON_EMISSION_URL, "carbon_emission_clean"),
+}
+
+# Seconds an API dataset stays cached before it is revalidated upstream
+API_CACHE_TTL = 3600
+# Eviction weight of the source datasets in the shared cache
+DATASET_CACHE_WEIGHT = 4.0
+
+
+class DataSource:
+    """
+    Where the analytics datasets come from. Subclasses implement fetch(); load()
+    goes through the shared cache, so every chart and session reuses one copy.
+    """
+
+    name = None
+    ttl = None
+
+    def fetch(self, dataset):
+        raise NotImplementedError
+
+    def load(self, dataset):
+        if dataset not in DATASETS:
+            raise KeyError(f"Unknown dataset: {dataset}")
+        key = ("data_sources", self.name, dataset)
+        return shared_cache.get_or_load(key, lambda: self.fetch(dataset), ttl=self.ttl,
+                                        dataset=dataset, weight=DATASET_CACHE_WEIGHT)
+
+
+class ApiDataSource(DataSource):
+    """
+    Datasets from Lambda/API Gateway (conditional requests, circuit breakers)
+    """
+
+    name = "api"
+    ttl = API_CACHE_TTL
+
+    def fetch(self, dataset):
+        api_url, _ = DATASETS[dataset]
+        return data_api.get_dataset(api_url)
+
+
+class CsvDataSource(DataSource):
+    """
+    Local snapshots: <name>.parquet when present (and pyarrow is installed), else <name>.csv.
+
+    Files are cached by path and modification time, so replacing a snapshot is
+    picked up on the next load without a TTL.
+    """
+
+    name = "csv"
+
+    def __init__(self, directory=SNAPSHOT_DIR):
+        self.directory = directory
+
+    def path(self, dataset):
+        _, file_stem = DATASETS[dataset]
+        parquet_path = os.path.join(self.directory, file_stem + ".parquet")
+        if os.path.exists(parquet_path):
+            return parquet_path
+        return os.path.join(self.directory, file_stem + ".csv")
+
+    def load(self, dataset):
+        return read_snapshot(self.path(dataset))
+
+
+class MockDataSource(DataSource):
+    """
+    Small synthetic datasets with the real schemas, for development without network or files
+    """
+
+    name = "mock"
+
+    def fetch(self, dataset):
+        rng = np.random.default_rng(0)
+        if dataset == "population_growth":
+            regions = ["Melbourne CBD - East", "Melbourne CBD - North", "Melbourne CBD - West",
+                       "Total Victoria", "Total Australia"]
+            start = np.array([4000, 1700, 2500, 4800000, 19400000], dtype=float)
+            growth = rng.uniform(1.01, 1.08, size=(len(regions), 21))
+            values = np.round(start[:, None] * np.cumprod(growth, axis=1))
+            frame = pd.DataFrame(values, columns=[str(year) for year in range(2001, 2022)])
+            frame.insert(0, "region", regions)
+            frame["area"] = [0.8, 0.6, 1.0, 227444.0, 7688287.0]
+            return frame
+        if dataset == "vehicle_ownership":
+            values = np.array([[5.0e6], [19.6e6]]) * np.cumprod(rng.uniform(1.01, 1.04, size=(2, 5)), axis=1)
+            frame = pd.DataFrame(values, columns=[str(year) for year in range(2016, 2021)])
+            frame.insert(0, "state", ["Vic.", "Aust."])
+            return frame
+        transports = ["diesel", "electric", "hybrid", "lpg", "petrol", "private", "public", "walk/bicycle"]
+        return pd.DataFrame({"transport": transports,
+                             "carbon_emission": rng.uniform(1000, 3500, size=len(transports))})
+
+
+SOURCES = {
+    "api": ApiDataSource,
+    "csv": CsvDataSource,
+    "mock": MockDataSource,
+}
+
+_sources = {}
+
+
+def get_data_source(name=None):
+    """
+    The configured source (DASHBOARD_DATA_SOURCE), or the named one
+    """
+    name = name or DEFAULT_SOURCE
+    if name not in SOURCES:
+        raise ValueError(f"Unknown data source: {name}")
+    source = _sources.get(name)
+    if source is None:
+        source = _sources[name] = SOURCES[name]()
+    return source
+
+
+def load_dataset(dataset, source=None):
+    """
+    A dataset as a shared read-only DataFrame from the configured source
+    """
+    return get_data_source(source).load(dataset)
+
+
+def read_snapshot(path):
+    """
+    Read a CSV or parquet file through the shared cache, keyed by path and modification time
+    """
+    key = ("data_sources", "file", os.path.abspath(path), os.path.getmtime(path))
+
+    def read():
+        if path.endswith(".parquet"):
+            return pd.read_parquet(path)
+        return read_csv(path)
+
+    return shared_cache.get_or_load(key, read, dataset="snapshots", weight=DATASET_CACHE_WEIGHT)
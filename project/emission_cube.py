@@ -0,0 +1,158 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from csv_reader import read_csv
+from data_sources import DATASET_CACHE_WEIGHT, SNAPSHOT_DIR, read_snapshot
+from multi_hot import decode_list_column, mean_by_category
+from quantile_sketch import group_sketches, merge_group_sketches
+from shared_cache import shared_cache
+
+RAW_EMISSION_FILE = os.path.join(SNAPSHOT_DIR, "carbon_emission_raw.csv")
+
+# Vehicle Monthly Distance Km bands (left-closed), as [start, end) edges and labels
+DISTANCE_EDGES = [0, 100, 500, 1000, 2500, 5000, np.inf]
+DISTANCE_BANDS = ["0-99 km", "100-499 km", "500-999 km", "1000-2499 km", "2500-4999 km", "5000+ km"]
+
+# Cube dimensions; "Mode" is the vehicle type for private transport, else the transport
+# type (the categories of the clean emission chart), so it adds no extra cells
+CUBE_DIMENSIONS = ["Mode", "Transport", "Vehicle Type", "Diet", "Heating Energy Source", "Distance Band"]
+
+# Dimensions offered as filters on the environment page
+FILTER_DIMENSIONS = ["Transport", "Vehicle Type", "Diet", "Heating Energy Source", "Distance Band"]
+
+# Rows read per chunk when sketching the emission distribution, and the percentiles reported
+SKETCH_CHUNK_ROWS = 2000
+SKETCH_QUANTILES = [0.0, 0.05, 0.25, 0.5, 0.75, 0.95, 1.0]
+
+# Survey columns holding stringified lists of categories (see multi_hot.py)
+HABIT_COLUMNS = {"Recycling": "Recycling", "Cooking_With": "Cooking appliance"}
+
+
+def transport_mode(carbon_emission):
+    """
+    The vehicle type for private transport, else the transport type
+    """
+    vehicle_type = carbon_emission["Vehicle Type"].fillna("none")
+    transport = carbon_emission["Transport"]
+    return vehicle_type.where(transport == "private", transport)
+
+
+def build_emission_cube(carbon_emission):
+    """
+    Aggregate the raw survey into sum/count/min/max of CarbonEmission per combination
+    of the cube dimensions, in one groupby pass.
+
+    Parameters:
+    carbon_emission (pd.DataFrame): The raw carbon emission survey.
+
+    Returns:
+    pd.DataFrame: One row per non-empty cell, dimensions as categoricals.
+    """
+    dimensions = pd.DataFrame({
+        "Mode": transport_mode(carbon_emission),
+        "Transport": carbon_emission["Transport"],
+        "Vehicle Type": carbon_emission["Vehicle Type"].fillna("none"),
+        "Diet": carbon_emission["Diet"],
+        "Heating Energy Source": carbon_emission["Heating Energy Source"],
+        "Distance Band": pd.cut(carbon_emission["Vehicle Monthly Distance Km"], DISTANCE_EDGES,
+                                right=False, labels=DISTANCE_BANDS),
+    }).astype("category")
+    dimensions["CarbonEmission"] = carbon_emission["CarbonEmission"].to_numpy()
+
+    cube = dimensions.groupby(CUBE_DIMENSIONS, observed=True)["CarbonEmission"] \
+        .agg(["sum", "count", "min", "max"]).reset_index()
+    return cube
+
+
+def load_emission_cube(file_path=RAW_EMISSION_FILE):
+    """
+    The cube for the raw survey file, built once per file version and shared by all
+    sessions; None when the raw survey file is not available
+    """
+    if not os.path.exists(file_path):
+        return None
+    key = ("emission_cube", os.path.abspath(file_path), os.path.getmtime(file_path))
+    return shared_cache.get_or_load(key, lambda: build_emission_cube(read_snapshot(file_path)),
+                                    dataset="emission_cube", weight=DATASET_CACHE_WEIGHT)
+
+
+def filter_cube(cube, filters):
+    """
+    Cube cells matching every filter ({dimension: selected values}; empty selections are ignored)
+    """
+    mask = np.ones(len(cube), dtype=bool)
+    for dimension, values in filters.items():
+        if values:
+            mask &= cube[dimension].isin(values).to_numpy()
+    return cube[mask]
+
+
+def rollup(cube, by, filters=None):
+    """
+    Re-aggregate (filtered) cube cells by some dimensions, without touching the raw rows.
+
+    Returns sum, count, min, max and mean CarbonEmission per group, largest mean first.
+    """
+    cells = filter_cube(cube, filters or {})
+    grouped = cells.groupby(by, observed=True).agg(
+        {"sum": "sum", "count": "sum", "min": "min", "max": "max"}).reset_index()
+    grouped["mean"] = grouped["sum"] / grouped["count"]
+    return grouped.sort_values("mean", ascending=False).reset_index(drop=True)
+
+
+def load_habit_emissions(column, file_path=RAW_EMISSION_FILE):
+    """
+    Mean CarbonEmission of respondents per category of a list-valued column (e.g.
+    each recycled material), decoded to multi-hot once per file version; None when
+    the raw survey file is not available
+    """
+    if not os.path.exists(file_path):
+        return None
+    key = ("habit_emissions", column, os.path.abspath(file_path), os.path.getmtime(file_path))
+
+    def build():
+        carbon_emission = read_snapshot(file_path)
+        multi_hot, _, _ = decode_list_column(carbon_emission[column])
+        return mean_by_category(multi_hot, carbon_emission["CarbonEmission"])
+
+    return shared_cache.get_or_load(key, build, dataset="emission_cube", weight=DATASET_CACHE_WEIGHT)
+
+
+def build_emission_sketches(file_path, chunk_rows=SKETCH_CHUNK_ROWS):
+    """
+    KLL quantile sketches of CarbonEmission per transport mode, reading the survey in
+    chunks: each chunk is sketched on its own and merged into the totals, so memory
+    stays bounded however large the file is.
+    """
+    sketches = {}
+    columns = ["Transport", "Vehicle Type", "CarbonEmission"]
+    for chunk in read_csv(file_path, usecols=columns, chunksize=chunk_rows):
+        partial = group_sketches(transport_mode(chunk).to_numpy(), chunk["CarbonEmission"].to_numpy(), seed=0)
+        merge_group_sketches(sketches, partial)
+    return sketches
+
+
+def emission_quantiles(sketches, qs=SKETCH_QUANTILES):
+    """
+    Table of count and approximate percentiles per group, one column per quantile (p0 ... p100)
+    """
+    rows = []
+    for mode, sketch in sketches.items():
+        row = {"Mode": mode, "count": sketch.count}
+        row.update(zip([f"p{round(q * 100)}" for q in qs], sketch.quantiles(qs)))
+        rows.append(row)
+    return pd.DataFrame(rows).sort_values("p50", ascending=False).reset_index(drop=True)
+
+
+def load_emission_quantiles(file_path=RAW_EMISSION_FILE):
+    """
+    Precomputed emission percentiles per transport mode, built once per file version;
+    None when the raw survey file is not available
+    """
+    if not os.path.exists(file_path):
+        return None
+    key = ("emission_quantiles", os.path.abspath(file_path), os.path.getmtime(file_path))
+    return shared_cache.get_or_load(key, lambda: emission_quantiles(build_emission_sketches(file_path)),
+                                    dataset="emission_cube", weight=DATASET_CACHE_WEIGHT)
@@ -0,0 +1,121 @@
+"""
+Pre-render every static chart from the cleaned CSVs into dist/charts.
+
+Each chart is built in a worker process and written as Plotly JSON, standalone
+HTML and (when kaleido is installed) PNG. File names carry a content hash, so
+api_server.py serves them as immutable; manifest.json maps chart names to files.
+
+Run with:
+    python export_figures.py [--out dist/charts] [--workers 4] [--formats json,html,png]
+"""
+import argparse
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUT_DIR = os.path.join(PROJECT_DIR, "dist", "charts")
+
+# Chart name -> (static_graphs module, data loader, cleaned CSV, figure builder)
+CHARTS = {
+    "population_growth_australia": ("aus_population_graph", "get_population_data",
+                                    "population_growth_clean.csv", "build_aus_population_figure"),
+    "population_growth_cbd": ("cbd_population_graph", "get_population_data",
+                              "population_growth_clean.csv", "build_cbd_population_figure"),
+    "population_density": ("population_density_graph", "get_population_data",
+                           "population_growth_clean.csv", "build_population_density_figure"),
+    "vehicle_ownership": ("vehicle_ownership_graph", "get_ownership_data",
+                          "vehicle_ownership_clean.csv", "build_vehicle_ownership_figure"),
+    "carbon_emission": ("carbon_emission_graph", "get_emission_data",
+                        "carbon_emission_clean.csv", "build_carbon_emission_figure"),
+}
+
+FORMATS = ("json", "html", "png")
+HAS_KALEIDO = importlib.util.find_spec("kaleido") is not None
+
+
+def build_figure(name):
+    module_name, loader_name, file_name, builder_name = CHARTS[name]
+    module = importlib.import_module(f"static_graphs.{module_name}")
+    data = getattr(module, loader_name)(file_name)
+    return getattr(module, builder_name)(data)
+
+
+def render(figure, name, fmt):
+    if fmt == "json":
+        return figure.to_json().encode("utf-8")
+    if fmt == "html":
+        # A fixed div id keeps the HTML (and so its hash) identical between runs
+        return figure.to_html(include_plotlyjs="cdn", full_html=True, div_id=name).encode("utf-8")
+    return figure.to_image(format="png", width=1200, height=figure.layout.height or 500)
+
+
+def write_hashed(out_dir, name, fmt, content):
+    """
+    Write content as <name>-<hash>.<fmt> (skipped when that file already exists)
+    """
+    digest = hashlib.sha256(content).hexdigest()
+    file_name = f"{name}-{digest[:8]}.{fmt}"
+    path = os.path.join(out_dir, file_name)
+    if not os.path.exists(path):
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as output:
+            output.write(content)
+        os.replace(temporary, path)
+    return {"file": file_name, "sha256": digest, "bytes": len(content)}
+
+
+def export_chart(name, out_dir, formats):
+    """
+    Build one chart and write its artifacts (runs in a worker process)
+    """
+    figure = build_figure(name)
+    return name, {fmt: write_hashed(out_dir, name, fmt, render(figure, name, fmt)) for fmt in formats}
+
+
+def export_all(out_dir=DEFAULT_OUT_DIR, formats=FORMATS, workers=None, names=None):
+    """
+    Export the charts in parallel and write manifest.json; returns the manifest,
+    which lists only the charts that were exported
+    """
+    formats = [fmt for fmt in formats if fmt != "png" or HAS_KALEIDO]
+    names = list(names or CHARTS)
+    os.makedirs(out_dir, exist_ok=True)
+
+    manifest = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {name: pool.submit(export_chart, name, out_dir, formats) for name in names}
+        for name, future in futures.items():
+            try:
+                _, artifacts = future.result()
+                manifest[name] = artifacts
+            except Exception as e:
+                print(f"Chart export failed for {name}: {str(e)}")
+
+    with open(os.path.join(out_dir, "manifest.json"), "w") as output:
+        json.dump(manifest, output, indent=2, sort_keys=True)
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", default=DEFAULT_OUT_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    args = parser.parse_args()
+
+    if "png" in args.formats and not HAS_KALEIDO:
+        print("kaleido is not installed; skipping PNG export")
+    manifest = export_all(args.out, args.formats.split(","), args.workers)
+    for name, artifacts in sorted(manifest.items()):
+        print(f"{name}: {', '.join(artifact['file'] for artifact in artifacts.values())}")
+
+    # A missing chart must fail the build rather than ship an incomplete manifest
+    failed = [name for name in CHARTS if name not in manifest]
+    if failed:
+        print(f"{len(failed)} of {len(CHARTS)} charts failed to export: {', '.join(failed)}")
+        sys.exit(1)
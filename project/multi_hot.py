@@ -0,0 +1,84 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# A stringified Python list of strings, e.g. "['Stove', 'Oven']" or "[]"
+LIST_VALUE = re.compile(r"^\[(\s*'[^']*'\s*(,\s*'[^']*'\s*)*)?\]$")
+# Brackets and quotes stripped before splitting on the separator
+LIST_DELIMITERS = r"[\[\]']"
+
+
+def find_list_columns(df):
+    """
+    Names of the text columns whose every non-empty value is a stringified list
+    """
+    columns = []
+    for column in df.columns:
+        if df[column].dtype != object:
+            continue
+        values = pd.Series(df[column].dropna().unique())
+        if len(values) and values.astype(str).str.match(LIST_VALUE).all():
+            columns.append(column)
+    return columns
+
+
+def decode_list_column(series):
+    """
+    Decode a column of stringified lists into multi-hot indicators and a bitmask.
+
+    Rows are factorized first, so the string parsing runs once per distinct list
+    (16 for Recycling in the 10,000-row survey), then expanded by the row codes.
+
+    Returns:
+    (pd.DataFrame, pd.Series, list): one boolean column per category, the bitmask
+    (bit i set when categories[i] is present) and the categories in bit order.
+    """
+    codes, uniques = pd.factorize(series.fillna("[]"))
+    items = pd.Series(uniques, dtype=object).str.replace(LIST_DELIMITERS, "", regex=True)
+    indicators = items.str.get_dummies(sep=", ")
+    # Empty lists decode to an empty string, not a category
+    indicators = indicators.drop(columns=[""], errors="ignore")
+    categories = list(indicators.columns)
+
+    unique_hot = indicators.to_numpy(dtype=bool)
+    mask_dtype = np.min_scalar_type((1 << len(categories)) - 1) if categories else np.uint8
+    unique_masks = (unique_hot * (1 << np.arange(len(categories), dtype=np.uint64))).sum(axis=1).astype(mask_dtype)
+
+    multi_hot = pd.DataFrame(unique_hot[codes], index=series.index, columns=categories)
+    bitmask = pd.Series(unique_masks[codes], index=series.index, name=series.name)
+    return multi_hot, bitmask, categories
+
+
+def decode_list_columns(df, columns=None):
+    """
+    Replace stringified list columns with "<column>: <category>" boolean columns
+    and a "<column> Mask" bitmask column.
+
+    Parameters:
+    df (pd.DataFrame): The survey data.
+    columns (list): The columns to decode; detected with find_list_columns when None.
+
+    Returns:
+    (pd.DataFrame, dict): The decoded DataFrame and the categories (in bit order) per column.
+    """
+    columns = find_list_columns(df) if columns is None else columns
+    decoded = [df.drop(columns=columns)]
+    categories = {}
+    for column in columns:
+        multi_hot, bitmask, categories[column] = decode_list_column(df[column])
+        decoded.append(multi_hot.add_prefix(f"{column}: "))
+        decoded.append(bitmask.rename(f"{column} Mask"))
+    return pd.concat(decoded, axis=1), categories
+
+
+def mean_by_category(multi_hot, values):
+    """
+    Mean of values over the rows containing each category, as one matrix product
+    """
+    hot = multi_hot.to_numpy(dtype=float)
+    counts = hot.sum(axis=0)
+    totals = hot.T @ np.asarray(values, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = totals / counts
+    return pd.DataFrame({"category": multi_hot.columns, "count": counts.astype(int), "mean": means})
@@ -0,0 +1,59 @@
+import math
+
+import numpy as np
+import streamlit as st
+
+DEFAULT_PAGE_SIZE = 25
+PAGE_SIZES = [10, 25, 50, 100]
+
+
+def page_frame(df, query="", sort_by=None, descending=False, page=1, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Filter, sort and slice a frame on the server, so only one page is sent to the browser.
+
+    query: case-insensitive text matched against every column.
+
+    Returns:
+    (pd.DataFrame, int, int): The rows of the page, the number of matching rows and the page count.
+    """
+    if query:
+        needle = query.lower()
+        mask = np.zeros(len(df), dtype=bool)
+        for column in df.columns:
+            mask |= df[column].astype(str).str.lower().str.contains(needle, regex=False).to_numpy()
+        df = df[mask]
+
+    total = len(df)
+    pages = max(1, math.ceil(total / page_size))
+    page = min(max(page, 1), pages)
+    start = (page - 1) * page_size
+
+    if sort_by in df.columns:
+        df = df.sort_values(sort_by, ascending=not descending, kind="stable", na_position="last")
+    return df.iloc[start:start + page_size], total, pages
+
+
+def show_paged_table(df, key, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Display a frame with server-side filtering, sorting and pagination controls
+    """
+    filter_col, sort_col, order_col, size_col = st.columns([3, 2, 1, 1])
+    query = filter_col.text_input("Filter rows", key=f"{key}_query")
+    sort_by = sort_col.selectbox("Sort by", ["(none)"] + list(df.columns), key=f"{key}_sort")
+    descending = order_col.selectbox("Order", ["Asc", "Desc"], key=f"{key}_order") == "Desc"
+    page_size = size_col.selectbox("Rows", PAGE_SIZES, index=PAGE_SIZES.index(page_size)
+                                   if page_size in PAGE_SIZES else 1, key=f"{key}_size")
+
+    page_key = f"{key}_page"
+    page_df, total, pages = page_frame(df, query, None if sort_by == "(none)" else sort_by,
+                                       descending, st.session_state.get(page_key, 1), page_size)
+    if st.session_state.get(page_key, 1) > pages:
+        # The filter left fewer pages than the page being shown
+        st.session_state[page_key] = pages
+    st.dataframe(page_df, use_container_width=True, hide_index=True)
+
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=page_key)
+    first = (page - 1) * page_size + 1 if total else 0
+    st.caption(f"Rows {first}-{min(page * page_size, total)} of {total}")
@@ -0,0 +1,128 @@
+import threading
+from collections import Counter
+
+import pandas as pd
+
+from parking_index import BAY_ID_COLUMNS
+
+
+def bay_key(record, id_column):
+    """
+    Comparable bay identifier of a status record ('7550.0' and 7550 -> '7550')
+    """
+    key = str(record.get(id_column)).strip()
+    return key[:-2] if key.endswith('.0') else key
+
+
+class StatusDelta:
+    """
+    Bays whose status changed between two consecutive polls of a street.
+
+    fresh is False when the poll (by its polled_at time) had already been applied,
+    e.g. a rerun served from the status cache.
+    """
+
+    def __init__(self, changed, removed, fresh=True, polled_at=None):
+        self.changed = changed
+        self.removed = removed
+        self.fresh = fresh
+        self.polled_at = polled_at
+
+    def __bool__(self):
+        return bool(self.changed or self.removed)
+
+    def frame(self):
+        """
+        Changed bay records as a DataFrame (empty when nothing changed)
+        """
+        return pd.DataFrame(self.changed)
+
+
+class _StreetSnapshot:
+    def __init__(self):
+        self.records = {}
+        self.counts = Counter()
+        self.frame = None
+        self.polled_at = None
+
+
+class StatusTracker:
+    """
+    Last known status of every bay per street, updated from consecutive polls.
+
+    Each poll is diffed against the previous one by bay ID; only bays whose
+    Status_Description changed are emitted, and the per-status counts are
+    adjusted for those bays instead of being recounted.
+    """
+
+    def __init__(self):
+        self._streets = {}
+        self._lock = threading.Lock()
+
+    def apply(self, street_name, records, polled_at=None):
+        """
+        Apply a poll's status records and return what changed since the last poll.
+
+        polled_at identifies the upstream poll (its fetch time); the same poll applied
+        again changes nothing and comes back with fresh = False.
+        """
+        records = records or []
+        id_column = next((column for column in BAY_ID_COLUMNS if records and column in records[0]), None)
+
+        with self._lock:
+            snapshot = self._streets.setdefault(street_name, _StreetSnapshot())
+            if polled_at is not None and polled_at == snapshot.polled_at:
+                return StatusDelta([], [], fresh=False, polled_at=polled_at)
+            snapshot.polled_at = polled_at
+            if id_column is None:
+                # Without bay IDs the poll cannot be diffed, so it replaces the snapshot
+                previous = snapshot.records
+                snapshot.records = {str(i): record for i, record in enumerate(records)}
+                snapshot.counts = Counter(record.get('Status_Description') for record in records)
+                snapshot.frame = None
+                return StatusDelta(list(records), [key for key in previous if key not in snapshot.records],
+                                   polled_at=polled_at)
+
+            changed = []
+            seen = set()
+            for record in records:
+                key = bay_key(record, id_column)
+                seen.add(key)
+                previous = snapshot.records.get(key)
+                status = record.get('Status_Description')
+                if previous is None or previous.get('Status_Description') != status:
+                    if previous is not None:
+                        snapshot.counts[previous.get('Status_Description')] -= 1
+                    snapshot.counts[status] += 1
+                    changed.append(record)
+                snapshot.records[key] = record
+
+            removed = [key for key in snapshot.records if key not in seen]
+            for key in removed:
+                snapshot.counts[snapshot.records.pop(key).get('Status_Description')] -= 1
+
+            if changed or removed:
+                snapshot.frame = None
+            return StatusDelta(changed, removed, polled_at=polled_at)
+
+    def summary(self, street_name):
+        """
+        Status/Count table for the street's current snapshot
+        """
+        with self._lock:
+            snapshot = self._streets.get(street_name)
+            counts = snapshot.counts.items() if snapshot else []
+            counts = [(status, count) for status, count in counts if status is not None and count > 0]
+        return pd.DataFrame(sorted(counts, key=lambda item: -item[1]), columns=['Status', 'Count'])
+
+    def frame(self, street_name):
+        """
+        Current snapshot of the street as a DataFrame, rebuilt only after a change
+        """
+        with self._lock:
+            snapshot = self._streets.get(street_name)
+            if snapshot is None:
+                return pd.DataFrame()
+            if snapshot.frame is None:
+                snapshot.frame = pd.DataFrame(list(snapshot.records.values()))
+            return snapshot.frame
@@ -0,0 +1,141 @@
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+# The car parks are in Melbourne; polls are binned by local weekday and hour whatever the server clock
+MELBOURNE_TZ = ZoneInfo('Australia/Melbourne')
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+# Status values that count towards the occupancy rate
+OCCUPIED_STATUS = 'Occupied'
+COUNTED_STATUSES = ['Occupied', 'Unoccupied']
+
+
+def slot_hours(time_slots):
+    """
+    Convert slot labels such as '7:00 AM' into their starting hour (0-23)
+    """
+    return pd.to_datetime(pd.Series(time_slots), format='%I:%M %p').dt.hour.to_numpy()
+
+
+class OccupancyHistory:
+    """
+    Running occupancy totals per street, weekday and hourly time slot.
+
+    Every poll adds its occupied and observed bay counts into two
+    (street, weekday, slot) count arrays, so the heatmap is a single division
+    no matter how many weeks of polls have been recorded.
+    """
+
+    def __init__(self, time_slots, store=None):
+        self.time_slots = list(time_slots)
+        # Optional AnalyticsStore that also receives every poll, for ad-hoc queries
+        self.store = store
+        hours = slot_hours(self.time_slots)
+        # Lookup table from hour of day to slot column (-1 = outside the slots)
+        self._hour_to_slot = np.full(24, -1, dtype=np.int64)
+        self._hour_to_slot[hours] = np.arange(len(hours))
+
+        self.streets = []
+        self._street_index = {}
+        self._occupied = np.zeros((0, 7, len(hours)), dtype=np.int64)
+        self._observed = np.zeros((0, 7, len(hours)), dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def _street_rows(self, street_names):
+        """
+        Map street names to row numbers, growing the count arrays for new streets
+        """
+        for name in pd.unique(pd.Series(street_names, dtype=object)):
+            if name not in self._street_index:
+                self._street_index[name] = len(self.streets)
+                self.streets.append(name)
+
+        missing = len(self.streets) - self._occupied.shape[0]
+        if missing > 0:
+            # Grow geometrically so adding streets one by one stays cheap
+            extra = max(missing, self._occupied.shape[0])
+            padding = np.zeros((extra,) + self._occupied.shape[1:], dtype=np.int64)
+            self._occupied = np.concatenate([self._occupied, padding])
+            self._observed = np.concatenate([self._observed, padding])
+
+        return pd.Series(street_names, dtype=object).map(self._street_index).to_numpy(dtype=np.int64)
+
+    def record(self, street_name, status_df, timestamp=None):
+        """
+        Add one status poll of a street to the history
+        """
+        if status_df is None or status_df.empty or 'Status_Description' not in status_df.columns:
+            return
+
+        status_summary = status_df['Status_Description'].value_counts().reset_index()
+        status_summary.columns = ['Status', 'Count']
+        self.record_summary(street_name, status_summary, timestamp)
+
+    def record_summary(self, street_name, status_summary, timestamp=None):
+        """
+        Add one poll of a street from its Status/Count summary table
+        """
+        if status_summary.empty:
+            return
+
+        counts = status_summary.set_index('Status')['Count']
+        occupied = int(counts.get(OCCUPIED_STATUS, 0))
+        observed = int(counts.reindex(COUNTED_STATUSES, fill_value=0).sum())
+        self.record_counts(
+            pd.DataFrame({
+                'street': [street_name],
+                'timestamp': [timestamp or datetime.now(MELBOURNE_TZ)],
+                'occupied': [occupied],
+                'observed': [observed],
+            })
+        )
+
+    def record_counts(self, counts_df):
+        """
+        Bin a frame of polls (street, timestamp, occupied, observed) into the history.
+
+        Used for single polls as well as for backfilling weeks of recorded history.
+        """
+        if counts_df.empty:
+            return
+
+        timestamps = pd.to_datetime(counts_df['timestamp'])
+        slots = self._hour_to_slot[timestamps.dt.hour.to_numpy()]
+        weekdays = timestamps.dt.weekday.to_numpy()
+        in_slot = slots >= 0
+
+        with self._lock:
+            rows = self._street_rows(counts_df['street'].to_numpy())
+            cells = (rows[in_slot], weekdays[in_slot], slots[in_slot])
+            np.add.at(self._occupied, cells, counts_df['occupied'].to_numpy(dtype=np.int64)[in_slot])
+            np.add.at(self._observed, cells, counts_df['observed'].to_numpy(dtype=np.int64)[in_slot])
+
+        if self.store is not None:
+            self.store.record_occupancy(counts_df)
+
+    def heatmap(self, weekday=None):
+        """
+        Occupancy rate (%) per street and time slot.
+
+        weekday: index 0-6 (Monday = 0) or None to combine every day of the week.
+        """
+        with self._lock:
+            occupied = self._occupied[:len(self.streets)]
+            observed = self._observed[:len(self.streets)]
+            if weekday is None:
+                occupied = occupied.sum(axis=1)
+                observed = observed.sum(axis=1)
+            else:
+                occupied = occupied[:, weekday, :]
+                observed = observed[:, weekday, :]
+            streets = list(self.streets)
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rates = np.where(observed > 0, occupied * 100.0 / observed, np.nan)
+
+        return pd.DataFrame(rates, index=streets, columns=self.time_slots)
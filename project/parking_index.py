@@ -0,0 +1,113 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Column names the status API has used for bay identifiers and zone numbers
+BAY_ID_COLUMNS = ['KerbsideID', 'Kerbsideid', 'kerbsideid', 'Bay_ID', 'BayID', 'bay_id']
+ZONE_NUMBER_COLUMNS = ['Zone_Number', 'ZoneNumber', 'zone_number', 'Parkingzone', 'ParkingZone']
+
+STATUS_GROUPS = ['Unoccupied', 'Occupied']
+
+
+def find_column(df, candidates):
+    """
+    Return the first candidate column present in the frame, or None
+    """
+    for column in candidates:
+        if column in df.columns:
+            return column
+    return None
+
+
+def normalise_ids(values):
+    """
+    Turn bay or zone identifiers into comparable strings ('7550.0' and 7550 -> '7550')
+    """
+    ids = pd.Series(values).astype(str).str.strip()
+    return ids.str.replace(r'\.0$', '', regex=True).to_numpy(dtype=str)
+
+
+class BayZoneIndex:
+    """
+    Sorted bay ID -> parking zone lookup shared across polls.
+
+    The key arrays are only rebuilt when a poll contains bays that have not been
+    seen before; every other poll is a single searchsorted over the bay IDs.
+    """
+
+    def __init__(self):
+        self._bay_ids = np.zeros(0, dtype=str)
+        self._zones = np.zeros(0, dtype=str)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._bay_ids)
+
+    def _positions(self, bay_ids):
+        """
+        Positions of the bays in the sorted keys, with a mask of which ones were found
+        """
+        positions = np.searchsorted(self._bay_ids, bay_ids)
+        positions = np.minimum(positions, max(len(self._bay_ids) - 1, 0))
+        found = (self._bay_ids[positions] == bay_ids) if len(self._bay_ids) else np.zeros(len(bay_ids), dtype=bool)
+        return positions, found
+
+    def update(self, status_df):
+        """
+        Add the bay -> zone pairs of bays not yet in the index
+        """
+        bay_column = find_column(status_df, BAY_ID_COLUMNS)
+        zone_column = find_column(status_df, ZONE_NUMBER_COLUMNS)
+        if bay_column is None or zone_column is None:
+            return
+
+        pairs = status_df[[bay_column, zone_column]].dropna()
+        bay_ids = normalise_ids(pairs[bay_column])
+        with self._lock:
+            _, found = self._positions(bay_ids)
+            if found.all():
+                return
+            new_bays, first = np.unique(bay_ids[~found], return_index=True)
+            new_zones = normalise_ids(pairs[zone_column])[~found][first]
+
+            bay_keys = np.concatenate([self._bay_ids, new_bays])
+            order = np.argsort(bay_keys, kind='stable')
+            self._bay_ids = bay_keys[order]
+            self._zones = np.concatenate([self._zones, new_zones])[order]
+
+    def lookup(self, bay_ids):
+        """
+        Parking zone of each bay ID ('' for bays not in the index)
+        """
+        bay_ids = normalise_ids(bay_ids)
+        with self._lock:
+            if not len(self._bay_ids):
+                return np.full(len(bay_ids), '', dtype=object)
+            positions, found = self._positions(bay_ids)
+            return np.where(found, self._zones[positions], '').astype(object)
+
+    def zone_counts(self, status_df, zones):
+        """
+        Count unoccupied and occupied bays per parking zone for one status poll
+        """
+        zones = pd.unique(normalise_ids(zones))
+        counts = pd.DataFrame(0, index=pd.Index(zones, name='Parkingzone'), columns=STATUS_GROUPS + ['Total'])
+
+        bay_column = find_column(status_df, BAY_ID_COLUMNS)
+        if bay_column is None or 'Status_Description' not in status_df.columns or not len(zones):
+            return counts.reset_index()
+
+        bay_zones = self.lookup(status_df[bay_column])
+        zone_codes = pd.Categorical(bay_zones, categories=zones).codes.astype(np.int64)
+        status_codes = pd.Categorical(status_df['Status_Description'], categories=STATUS_GROUPS).codes.astype(np.int64)
+        in_zone = zone_codes >= 0
+
+        # One bincount over (zone, status) pairs; status -1 (other) lands in the last column
+        n_columns = len(STATUS_GROUPS) + 1
+        flat = zone_codes[in_zone] * n_columns + np.where(status_codes[in_zone] >= 0, status_codes[in_zone], n_columns - 1)
+        table = np.bincount(flat, minlength=len(zones) * n_columns).reshape(len(zones), n_columns)
+
+        counts[STATUS_GROUPS] = table[:, :len(STATUS_GROUPS)]
+        counts['Total'] = table.sum(axis=1)
+        return counts.reset_index()
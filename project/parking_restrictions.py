@@ -0,0 +1,179 @@
+import re
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from parking_history import MELBOURNE_TZ
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+DAY_NAMES = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+# Restriction Display codes that are not available to general parking (loading zones,
+# disabled permits, no stopping/parking, permit only)
+RESTRICTED_CODES = re.compile(r'^(LZ|DP|NS|NP|PP|S/)', re.IGNORECASE)
+
+ZONE_COLUMNS = ['Parkingzone', 'Restriction Days', 'Time Restrictions start',
+                'Time Restrictions Finish', 'Restriction Display']
+
+
+def parse_day_mask(days_text):
+    """
+    Convert a restriction days value ('Mon-Fri', 'Sat-Sun', 'Mon,Wed', 'Daily') into a
+    7-bit mask with Monday as bit 0
+    """
+    if not isinstance(days_text, str):
+        return 0
+    text = days_text.strip().lower()
+    if text in ('daily', 'all days', 'everyday', 'every day'):
+        return 0x7F
+
+    mask = 0
+    for part in re.split(r'[,&/]| and ', text):
+        days = [DAY_NAMES.index(name[:3]) for name in re.findall(r'[a-z]+', part) if name[:3] in DAY_NAMES]
+        if len(days) >= 2 and ('-' in part or ' to ' in part):
+            # Ranges may wrap around the weekend, e.g. 'Sat-Mon'
+            span = (days[-1] - days[0]) % 7
+            for offset in range(span + 1):
+                mask |= 1 << ((days[0] + offset) % 7)
+        else:
+            for day in days:
+                mask |= 1 << day
+    return mask
+
+
+def parse_minutes(times):
+    """
+    Convert time strings such as '07:30:00' or '7:30 PM' into minutes after midnight
+    """
+    parsed = pd.to_datetime(times.astype(str).str.strip(), format='mixed', errors='coerce')
+    return (parsed.dt.hour * 60 + parsed.dt.minute).to_numpy(dtype=float)
+
+
+def parse_max_stay(displays):
+    """
+    Convert Restriction Display codes into the maximum stay in minutes ('2P' -> 120,
+    '1/2P' -> 30, 'LZ30' -> 30); NaN where the code has no time limit
+    """
+    displays = displays.astype(str).str.upper().str.strip()
+    fraction = displays.str.extract(r'(\d+)/(\d+)P').astype(float)
+    hours = displays.str.extract(r'(?<![/\d])(\d+)P')[0].astype(float)
+    minutes = displays.str.extract(r'(?:LZ|P)(\d+)$')[0].astype(float)
+
+    stay = (fraction[0] / fraction[1] * 60).to_numpy()
+    stay = np.where(np.isnan(stay), hours.to_numpy() * 60, stay)
+    stay = np.where(np.isnan(stay), minutes.to_numpy(), stay)
+    return stay
+
+
+class RestrictionIndex:
+    """
+    Sign-plate restrictions compiled into minute-of-week intervals.
+
+    Each zone's rows are parsed once when the zone is first seen. Every restriction row
+    is expanded into one interval per restricted day, so "can I park at time T" is a
+    handful of array comparisons over all zones at once.
+    """
+
+    def __init__(self):
+        self.zones = []
+        self._zone_index = {}
+        self._zone_ids = np.zeros(0, dtype=np.int64)
+        self._start = np.zeros(0, dtype=np.int64)
+        self._end = np.zeros(0, dtype=np.int64)
+        self._max_stay = np.zeros(0, dtype=float)
+        self._general = np.zeros(0, dtype=bool)
+        self._display = np.zeros(0, dtype=object)
+        self._lock = threading.Lock()
+
+    def add_zones(self, zones_df):
+        """
+        Compile the restriction rows of zones that have not been seen before
+        """
+        if zones_df is None or zones_df.empty or not set(ZONE_COLUMNS).issubset(zones_df.columns):
+            return
+
+        zone_codes = zones_df['Parkingzone'].astype(str)
+        with self._lock:
+            new_rows = zones_df[~zone_codes.isin(self._zone_index)]
+            if new_rows.empty:
+                return
+
+            # Day strings repeat heavily, so only the distinct values are parsed
+            days = new_rows['Restriction Days']
+            masks = days.map({value: parse_day_mask(value) for value in days.unique()}).to_numpy(dtype=np.int64)
+            start = parse_minutes(new_rows['Time Restrictions start'])
+            end = parse_minutes(new_rows['Time Restrictions Finish'])
+            display = new_rows['Restriction Display'].astype(str)
+            max_stay = parse_max_stay(display)
+            general = ~display.str.strip().str.match(RESTRICTED_CODES).to_numpy()
+
+            valid = ~(np.isnan(start) | np.isnan(end))
+            start = np.where(valid, start, 0).astype(np.int64)
+            end = np.where(valid, end, 0).astype(np.int64)
+            # Restrictions that finish at or before they start run past midnight
+            end = np.where(end <= start, end + MINUTES_PER_DAY, end)
+
+            for code in pd.unique(new_rows['Parkingzone'].astype(str)):
+                self._zone_index[code] = len(self.zones)
+                self.zones.append(code)
+            row_zone = new_rows['Parkingzone'].astype(str).map(self._zone_index).to_numpy(dtype=np.int64)
+
+            # Expand every row into one interval per restricted day of the week
+            day_bits = (masks[:, None] >> np.arange(7)[None, :]) & 1
+            row_idx, day_idx = np.nonzero((day_bits == 1) & valid[:, None])
+            offsets = day_idx * MINUTES_PER_DAY
+
+            self._zone_ids = np.concatenate([self._zone_ids, row_zone[row_idx]])
+            self._start = np.concatenate([self._start, start[row_idx] + offsets])
+            self._end = np.concatenate([self._end, end[row_idx] + offsets])
+            self._max_stay = np.concatenate([self._max_stay, max_stay[row_idx]])
+            self._general = np.concatenate([self._general, general[row_idx]])
+            self._display = np.concatenate([self._display, display.to_numpy(dtype=object)[row_idx]])
+
+    def evaluate(self, when=None, zones=None):
+        """
+        Report for each zone whether general parking is allowed at the given time.
+
+        Returns a DataFrame with the active restriction, the maximum stay in minutes
+        (NaN = no limit) and the minutes until the active restriction finishes.
+        """
+        when = when or datetime.now(MELBOURNE_TZ)
+        minute_of_week = when.weekday() * MINUTES_PER_DAY + when.hour * 60 + when.minute
+
+        with self._lock:
+            zone_codes = list(self.zones)
+            zone_ids, start, end = self._zone_ids, self._start, self._end
+            max_stay, general, display = self._max_stay, self._general, self._display
+
+        # Intervals that run past Sunday midnight are also checked one week earlier
+        active = ((start <= minute_of_week) & (minute_of_week < end)) | \
+                 ((start <= minute_of_week + MINUTES_PER_WEEK) & (minute_of_week + MINUTES_PER_WEEK < end))
+        remaining = np.where(start <= minute_of_week, end - minute_of_week,
+                             end - minute_of_week - MINUTES_PER_WEEK)
+
+        n_zones = len(zone_codes)
+        active_ids = zone_ids[active]
+        blocked = np.bincount(active_ids[~general[active]], minlength=n_zones) > 0
+
+        stay = np.full(n_zones, np.inf)
+        np.minimum.at(stay, active_ids, np.where(np.isnan(max_stay[active]), np.inf, max_stay[active]))
+        until = np.full(n_zones, np.inf)
+        np.minimum.at(until, active_ids, remaining[active].astype(float))
+
+        current = np.full(n_zones, '', dtype=object)
+        current[active_ids] = display[active]
+
+        result = pd.DataFrame({
+            'Parkingzone': zone_codes,
+            'Can Park': ~blocked,
+            'Active Restriction': current,
+            'Max Stay (min)': np.where(np.isinf(stay), np.nan, stay),
+            'Restriction Ends In (min)': np.where(np.isinf(until), np.nan, until),
+        })
+        if zones is not None:
+            result = result[result['Parkingzone'].isin([str(zone) for zone in zones])]
+        return result.reset_index(drop=True)
@@ -0,0 +1,281 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from parking_index import BAY_ID_COLUMNS, find_column, normalise_ids
+
+# Reference point for the local metric projection (Melbourne CBD)
+CBD_LATITUDE = -37.8136
+CBD_LONGITUDE = 144.9631
+METRES_PER_DEGREE_LAT = 110540.0
+METRES_PER_DEGREE_LON = 111320.0 * np.cos(np.radians(CBD_LATITUDE))
+
+LATITUDE_COLUMNS = ['Latitude', 'latitude', 'Lat', 'lat']
+LONGITUDE_COLUMNS = ['Longitude', 'longitude', 'Lon', 'lon', 'Lng', 'lng']
+LOCATION_COLUMNS = ['Location', 'location']
+
+# Zoom levels with precomputed cluster aggregates, and the cluster cell size in screen pixels
+CLUSTER_ZOOM_LEVELS = list(range(12, 19))
+CLUSTER_CELL_PIXELS = 64
+TILE_SIZE = 256
+
+
+def extract_coordinates(status_df):
+    """
+    Return latitude and longitude arrays for the status rows (NaN where missing).
+
+    Coordinates may come as separate columns or as a location column holding
+    {'lat': .., 'lon': ..} dicts or '(lat, lon)' strings.
+    """
+    lat_column = find_column(status_df, LATITUDE_COLUMNS)
+    lon_column = find_column(status_df, LONGITUDE_COLUMNS)
+    if lat_column is not None and lon_column is not None:
+        return (pd.to_numeric(status_df[lat_column], errors='coerce').to_numpy(dtype=float),
+                pd.to_numeric(status_df[lon_column], errors='coerce').to_numpy(dtype=float))
+
+    location_column = find_column(status_df, LOCATION_COLUMNS)
+    if location_column is None:
+        nan = np.full(len(status_df), np.nan)
+        return nan, nan.copy()
+
+    as_text = status_df[location_column].map(
+        lambda value: f"{value.get('lat')},{value.get('lon')}" if isinstance(value, dict) else value
+    )
+    parts = as_text.astype(str).str.extract(r'(-?\d+\.?\d*)\s*,\s*(-?\d+\.?\d*)').astype(float)
+    return parts[0].to_numpy(), parts[1].to_numpy()
+
+
+def to_metres(lat, lon):
+    """
+    Project coordinates onto a flat metre grid centred on the CBD
+    """
+    x = (np.asarray(lon, dtype=float) - CBD_LONGITUDE) * METRES_PER_DEGREE_LON
+    y = (np.asarray(lat, dtype=float) - CBD_LATITUDE) * METRES_PER_DEGREE_LAT
+    return x, y
+
+
+def to_world_pixels(lat, lon, zoom):
+    """
+    Web Mercator pixel coordinates of the points at the given zoom level
+    """
+    scale = TILE_SIZE * 2 ** zoom
+    sin_lat = np.sin(np.radians(np.asarray(lat, dtype=float)))
+    px = (np.asarray(lon, dtype=float) + 180.0) / 360.0 * scale
+    py = (0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * np.pi)) * scale
+    return px, py
+
+
+def viewport_bounds(lat, lon, zoom, width=800, height=500):
+    """
+    Return (lat_min, lat_max, lon_min, lon_max) visible in a map of the given pixel size
+    """
+    scale = TILE_SIZE * 2 ** zoom
+    px, py = to_world_pixels(lat, lon, zoom)
+    lon_min = (px - width / 2) / scale * 360.0 - 180.0
+    lon_max = (px + width / 2) / scale * 360.0 - 180.0
+    lat_edges = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (py + np.array([height, -height]) / 2) / scale))))
+    return float(lat_edges[0]), float(lat_edges[1]), float(lon_min), float(lon_max)
+
+
+class ClusterPyramid:
+    """
+    Free/total bay counts per map cell for each precomputed zoom level.
+
+    Each level keeps the cell of every bay, so an occupancy change is a +/-1 on
+    one counter per level rather than a re-aggregation.
+    """
+
+    def __init__(self, lat, lon, free):
+        self.levels = {}
+        for zoom in CLUSTER_ZOOM_LEVELS:
+            px, py = to_world_pixels(lat, lon, zoom)
+            keys = (np.floor(px / CLUSTER_CELL_PIXELS).astype(np.int64) << 32) + \
+                np.floor(py / CLUSTER_CELL_PIXELS).astype(np.int64)
+            _, cell_of_bay = np.unique(keys, return_inverse=True)
+            n_cells = int(cell_of_bay.max()) + 1 if len(cell_of_bay) else 0
+            total = np.bincount(cell_of_bay, minlength=n_cells)
+            self.levels[zoom] = {
+                'cell_of_bay': cell_of_bay,
+                'total': total,
+                'free': np.bincount(cell_of_bay, weights=free, minlength=n_cells).astype(np.int64),
+                'lat': np.bincount(cell_of_bay, weights=lat, minlength=n_cells) / np.maximum(total, 1),
+                'lon': np.bincount(cell_of_bay, weights=lon, minlength=n_cells) / np.maximum(total, 1),
+            }
+
+    def apply_changes(self, bays, now_free):
+        """
+        Update the free counts for bays whose occupancy flipped (each bay listed once)
+        """
+        delta = np.where(now_free, 1, -1)
+        for level in self.levels.values():
+            np.add.at(level['free'], level['cell_of_bay'][bays], delta)
+
+    def clusters(self, zoom, bounds):
+        """
+        Cluster aggregates of the level closest to the zoom, limited to the bounds
+        """
+        zoom = min(max(int(round(zoom)), CLUSTER_ZOOM_LEVELS[0]), CLUSTER_ZOOM_LEVELS[-1])
+        level = self.levels[zoom]
+        lat_min, lat_max, lon_min, lon_max = bounds
+        visible = (level['lat'] >= lat_min) & (level['lat'] <= lat_max) & \
+                  (level['lon'] >= lon_min) & (level['lon'] <= lon_max) & (level['total'] > 0)
+        return pd.DataFrame({
+            'Latitude': level['lat'][visible],
+            'Longitude': level['lon'][visible],
+            'Free': level['free'][visible],
+            'Total': level['total'][visible],
+        })
+
+
+class BayLocationIndex:
+    """
+    Uniform grid over all known bays for nearest-free-bay queries.
+
+    Bays are bucketed into square cells and stored in cell order, so a query only
+    visits rings of cells around the starting point. Occupancy is a flag array
+    updated in place by each status poll; the grid is only rebuilt when bays with
+    new coordinates appear.
+    """
+
+    def __init__(self, cell_size=100.0):
+        self.cell_size = cell_size
+        self._bay_ids = np.zeros(0, dtype=str)
+        self._lat = np.zeros(0)
+        self._lon = np.zeros(0)
+        self._x = np.zeros(0)
+        self._y = np.zeros(0)
+        self._free = np.zeros(0, dtype=bool)
+        # Bay positions sorted by bay ID, for in-place status updates
+        self._id_order = np.zeros(0, dtype=np.int64)
+        # Grid: bays sorted by cell key, with the distinct keys and their start offsets
+        self._cell_order = np.zeros(0, dtype=np.int64)
+        self._cell_keys = np.zeros(0, dtype=np.int64)
+        self._cell_starts = np.zeros(1, dtype=np.int64)
+        self._pyramid = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._bay_ids)
+
+    def _cell_of(self, x, y):
+        ix = np.floor(np.asarray(x) / self.cell_size).astype(np.int64)
+        iy = np.floor(np.asarray(y) / self.cell_size).astype(np.int64)
+        return ix, iy
+
+    @staticmethod
+    def _cell_key(ix, iy):
+        # Pack both cell coordinates into one sortable integer
+        return (np.asarray(ix, dtype=np.int64) << 32) + (np.asarray(iy, dtype=np.int64) + (1 << 31))
+
+    def _positions(self, bay_ids):
+        sorted_ids = self._bay_ids[self._id_order]
+        positions = np.minimum(np.searchsorted(sorted_ids, bay_ids), max(len(sorted_ids) - 1, 0))
+        if not len(sorted_ids):
+            return positions, np.zeros(len(bay_ids), dtype=bool)
+        return self._id_order[positions], sorted_ids[positions] == bay_ids
+
+    def _rebuild_grid(self):
+        self._x, self._y = to_metres(self._lat, self._lon)
+        self._id_order = np.argsort(self._bay_ids, kind='stable')
+        keys = self._cell_key(*self._cell_of(self._x, self._y))
+        self._cell_order = np.argsort(keys, kind='stable')
+        self._cell_keys, starts = np.unique(keys[self._cell_order], return_index=True)
+        self._cell_starts = np.append(starts, len(keys)).astype(np.int64)
+        self._pyramid = ClusterPyramid(self._lat, self._lon, self._free)
+
+    def update(self, status_df):
+        """
+        Apply a status poll: flip occupancy flags in place and add any new located bays
+        """
+        bay_column = find_column(status_df, BAY_ID_COLUMNS)
+        if bay_column is None or 'Status_Description' not in status_df.columns:
+            return
+
+        bay_ids = normalise_ids(status_df[bay_column])
+        free = (status_df['Status_Description'] == 'Unoccupied').to_numpy()
+        with self._lock:
+            positions, found = self._positions(bay_ids)
+            # A bay listed more than once in a poll keeps its last state, so a flip is counted once
+            reversed_positions = positions[found][::-1]
+            _, last = np.unique(reversed_positions, return_index=True)
+            bays = reversed_positions[last]
+            bay_free = free[found][::-1][last]
+            changed = self._free[bays] != bay_free
+            if changed.any():
+                bays = bays[changed]
+                self._free[bays] = bay_free[changed]
+                if self._pyramid is not None:
+                    self._pyramid.apply_changes(bays, bay_free[changed])
+
+            if not found.all():
+                lat, lon = extract_coordinates(status_df)
+                new = ~found & ~(np.isnan(lat) | np.isnan(lon))
+                if new.any():
+                    new_ids, first = np.unique(bay_ids[new], return_index=True)
+                    self._bay_ids = np.concatenate([self._bay_ids, new_ids])
+                    self._lat = np.concatenate([self._lat, lat[new][first]])
+                    self._lon = np.concatenate([self._lon, lon[new][first]])
+                    self._free = np.concatenate([self._free, free[new][first]])
+                    self._rebuild_grid()
+
+    def nearest_free(self, lat, lon, k=5, max_distance=2000.0):
+        """
+        Return up to k unoccupied bays closest to the point, nearest first
+        """
+        qx, qy = to_metres(lat, lon)
+        with self._lock:
+            if not len(self._bay_ids):
+                return pd.DataFrame(columns=['Bay ID', 'Latitude', 'Longitude', 'Distance (m)'])
+
+            cx, cy = self._cell_of(qx, qy)
+            max_ring = int(np.ceil(max_distance / self.cell_size))
+            found_idx = np.zeros(0, dtype=np.int64)
+            found_dist = np.zeros(0)
+
+            for ring in range(max_ring + 1):
+                # Cells on the border of the (2 * ring + 1)^2 square around the query cell
+                span = np.arange(-ring, ring + 1)
+                if ring == 0:
+                    ring_ix, ring_iy = np.array([cx]), np.array([cy])
+                else:
+                    ring_ix = np.concatenate([cx + span, cx + span, np.full(2 * ring - 1, cx - ring),
+                                              np.full(2 * ring - 1, cx + ring)])
+                    ring_iy = np.concatenate([np.full(2 * ring + 1, cy - ring), np.full(2 * ring + 1, cy + ring),
+                                              cy + span[1:-1], cy + span[1:-1]])
+
+                keys = self._cell_key(ring_ix, ring_iy)
+                slots = np.searchsorted(self._cell_keys, keys)
+                inside = slots < len(self._cell_keys)
+                slots, keys = slots[inside], keys[inside]
+                slots = slots[self._cell_keys[slots] == keys]
+                if len(slots):
+                    members = np.concatenate([self._cell_order[self._cell_starts[s]:self._cell_starts[s + 1]]
+                                              for s in slots])
+                    members = members[self._free[members]]
+                    distances = np.hypot(self._x[members] - qx, self._y[members] - qy)
+                    found_idx = np.concatenate([found_idx, members])
+                    found_dist = np.concatenate([found_dist, distances])
+
+                # Anything in rings further out is at least this far away
+                if len(found_idx) >= k and np.partition(found_dist, k - 1)[k - 1] <= ring * self.cell_size:
+                    break
+
+            keep = found_dist <= max_distance
+            order = np.argsort(found_dist[keep], kind='stable')[:k]
+            best = found_idx[keep][order]
+            return pd.DataFrame({
+                'Bay ID': self._bay_ids[best],
+                'Latitude': self._lat[best],
+                'Longitude': self._lon[best],
+                'Distance (m)': np.round(found_dist[keep][order], 1),
+            })
+
+    def clusters(self, zoom, bounds):
+        """
+        Free/total bay clusters for the map viewport at the given zoom level
+        """
+        with self._lock:
+            if self._pyramid is None:
+                return pd.DataFrame(columns=['Latitude', 'Longitude', 'Free', 'Total'])
+            return self._pyramid.clusters(zoom, bounds)
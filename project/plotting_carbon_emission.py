@@ -1,15 +1,9 @@
 import streamlit as st
 import plotly.graph_objects as go
-import pandas as pd
-import requests
+from data_sources import load_dataset
 
-def plotting_carbon_emission(api_url ="https://ldr1cwcs34.execute-api.ap-southeast-2.amazonaws.com/getCarbonEmission"):
-    # Fetch data from Lambda/API Gateway
-    response = requests.get(api_url)
-    data = response.json()  # Should be a list of dicts
-
-    # Convert to DataFrame
-    carbon_emission = pd.DataFrame(data)
+def plotting_carbon_emission(source=None):
+    carbon_emission = load_dataset("carbon_emission", source)
 
     # Sort by carbon_emission descending
     carbon_emission_sorted = carbon_emission.sort_values(by='carbon_emission', ascending=False).reset_index(drop=True)
@@ -38,4 +32,4 @@ def plotting_carbon_emission(api_url ="https://ldr1cwcs34.execute-api.ap-southea
     st.plotly_chart(carbon_emission_plot, use_container_width=True)
 
 # Example usage in your Streamlit app:
-# plotting_carbon_emission("https://your-api-gateway-url/prod/your-lambda-endpoint")
\ No newline at end of file
+# plotting_carbon_emission()  # or plotting_carbon_emission("csv") for the local snapshot
\ No newline at end of file
@@ -1,17 +1,10 @@
 import streamlit as st
-import plotly.graph_objects as go
-import pandas as pd
-import requests
 from plotly.subplots import make_subplots
-import pandas as pd
+from chart_utils import downsample, scatter_trace
+from data_sources import load_dataset
 
-def plotting_population_growth_aus(api_url = "https://ldr1cwcs34.execute-api.ap-southeast-2.amazonaws.com/getPopulationGrowth"):
-    # Fetch data from Lambda/API Gateway
-    response = requests.get(api_url)
-    data = response.json()  # Should be a list of dicts
-
-    # Convert to DataFrame
-    population_growth = pd.DataFrame(data)
+def plotting_population_growth_aus(source=None):
+    population_growth = load_dataset("population_growth", source)
     
     # Filter only Vic and Aus data
     regions = ["Total Victoria", "Total Australia"]
@@ -26,11 +19,16 @@ def plotting_population_growth_aus(api_url = "https://ldr1cwcs34.execute-api.ap-
     # Get 2 y-axes
     population_growth_plot = make_subplots(specs=[[{"secondary_y": True}]])
 
+    # Downsample each series to the chart width (a no-op for the census years); they
+    # are on separate axes, so each keeps its own points
+    vic_years, (vic_values,) = downsample(population_growth_aus.index, [population_growth_aus[regions[0]]])
+    aus_years, (aus_values,) = downsample(population_growth_aus.index, [population_growth_aus[regions[1]]])
+
     # Add traces: first region on primary y, second region on secondary y
     population_growth_plot.add_trace(
-        go.Scatter(
-            x = population_growth_aus.index,
-            y = population_growth_aus[regions[0]],
+        scatter_trace(
+            x = vic_years,
+            y = vic_values,
             mode = 'lines',
             name = regions[0],
             line = dict(color = set2_colors[0])
@@ -38,9 +36,9 @@ def plotting_population_growth_aus(api_url = "https://ldr1cwcs34.execute-api.ap-
         secondary_y=False
     )
     population_growth_plot.add_trace(
-        go.Scatter(
-            x = population_growth_aus.index,
-            y = population_growth_aus[regions[1]],
+        scatter_trace(
+            x = aus_years,
+            y = aus_values,
             mode = 'lines',
             name = regions[1],
             line = dict(color = set2_colors[1])
@@ -76,4 +74,4 @@ def plotting_population_growth_aus(api_url = "https://ldr1cwcs34.execute-api.ap-
     st.plotly_chart(population_growth_plot, use_container_width=True)
 
 # Example usage in your Streamlit app:
-# plotting_population_growth_aus("https://your-api-gateway-url/prod/your-lambda-endpoint")
\ No newline at end of file
+# plotting_population_growth_aus()  # or plotting_population_growth_aus("csv") for the local snapshot
\ No newline at end of file
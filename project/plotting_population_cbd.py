@@ -1,16 +1,10 @@
 import streamlit as st
 import plotly.graph_objects as go
-import pandas as pd
-import requests
+from data_sources import load_dataset
 
 
-def plotting_population_growth_cbd(api_url = "https://ldr1cwcs34.execute-api.ap-southeast-2.amazonaws.com/getPopulationGrowth"):
-    # Fetch data from Lambda/API Gateway
-    response = requests.get(api_url)
-    data = response.json()  # Should be a list of dicts
-
-    # Convert to DataFrame
-    population_growth = pd.DataFrame(data)
+def plotting_population_growth_cbd(source=None):
+    population_growth = load_dataset("population_growth", source)
     
     # Filter only CBD data
     regions = ["Melbourne CBD - East", "Melbourne CBD - North", "Melbourne CBD - West"]
@@ -63,4 +57,4 @@ def plotting_population_growth_cbd(api_url = "https://ldr1cwcs34.execute-api.ap-
     
 
 # Example usage in your Streamlit app:
-# plotting_population_growth_cbd("https://your-api-gateway-url/prod/your-lambda-endpoint")
\ No newline at end of file
+# plotting_population_growth_cbd()  # or plotting_population_growth_cbd("csv") for the local snapshot
\ No newline at end of file
@@ -1,15 +1,9 @@
 import streamlit as st
 import plotly.graph_objects as go
-import pandas as pd
-import requests
+from data_sources import load_dataset
 
-def plotting_vehicle_ownership(api_url = "https://ldr1cwcs34.execute-api.ap-southeast-2.amazonaws.com/getVehicleOwnership"):
-    # Fetch data from Lambda/API Gateway
-    response = requests.get(api_url)
-    data = response.json()  # Should be a list of dicts
-
-    # Convert to DataFrame
-    vehicle_ownership = pd.DataFrame(data)
+def plotting_vehicle_ownership(source=None):
+    vehicle_ownership = load_dataset("vehicle_ownership", source)
 
     years = [col for col in vehicle_ownership.columns if col.isdigit()]
     set2_colors = ["#e78ac3", "#a6d854"]
@@ -58,4 +52,4 @@ def plotting_vehicle_ownership(api_url = "https://ldr1cwcs34.execute-api.ap-sout
     
 
 # Example usage in your Streamlit app:
-# plotting_vehicle_ownership("https://your-api-gateway-url/prod/your-lambda-endpoint")
\ No newline at end of file
+# plotting_vehicle_ownership()  # or plotting_vehicle_ownership("csv") for the local snapshot
\ No newline at end of file
@@ -0,0 +1,161 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from csv_reader import read_csv
+from data_sources import DATASET_CACHE_WEIGHT, SNAPSHOT_DIR
+from shared_cache import shared_cache
+
+RAW_POPULATION_FILE = os.path.join(SNAPSHOT_DIR, "population_growth_raw.csv")
+
+# Layout of the ABS regional population table: identifier columns, then one ERP column per year
+SA2_ID_COLUMNS = ["S/T code", "S/T name", "GCCSA code", "GCCSA name", "SA4 code", "SA4 name",
+                  "SA3 code", "SA3 name", "SA2 code", "SA2 name"]
+FIRST_YEAR = 2001
+LAST_YEAR = 2021
+HEADER_ROWS = 9
+
+# Census years; intercensal values are interpolated between them
+CENSUS_YEARS = [2001, 2006, 2011, 2016, 2021]
+
+# Years averaged for rolling growth, and years fitted for the linear projection
+ROLLING_WINDOW = 5
+FIT_YEARS = 10
+PROJECTION_YEARS = 10
+
+
+def load_sa2_population(file_path=RAW_POPULATION_FILE):
+    """
+    Estimated resident population of every SA2 region per year, from the raw ABS table.
+
+    Returns:
+    pd.DataFrame: The SA2 identifier columns and one float column per year ("2001" ... "2021"),
+    or None when the raw table is not available.
+    """
+    if not os.path.exists(file_path):
+        return None
+    key = ("sa2_population", os.path.abspath(file_path), os.path.getmtime(file_path))
+
+    def load():
+        years = [str(year) for year in range(FIRST_YEAR, LAST_YEAR + 1)]
+        table = read_csv(file_path, skiprows=HEADER_ROWS, header=None, encoding="utf-8-sig",
+                         usecols=range(len(SA2_ID_COLUMNS) + len(years)))
+        table.columns = SA2_ID_COLUMNS + years
+        # Blank separators and the TOTAL AUSTRALIA/footer rows have no SA2 code
+        table = table.dropna(subset=["SA2 code"]).reset_index(drop=True)
+        table[years] = table[years].astype(float)
+        return table
+
+    return shared_cache.get_or_load(key, load, dataset="population_analytics", weight=DATASET_CACHE_WEIGHT)
+
+
+def population_matrix(population, region_column):
+    """
+    Split a population table into region names, year numbers and a regions x years array
+    """
+    year_columns = [col for col in population.columns if col.isdigit()]
+    regions = population[region_column].to_numpy()
+    years = np.array([int(col) for col in year_columns])
+    values = population[year_columns].to_numpy(dtype=float)
+    return regions, years, values
+
+
+def cagr(years, values):
+    """
+    Compound annual growth rate from the first to the last year, per region (NaN from zero)
+    """
+    span = years[-1] - years[0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = values[:, -1] / values[:, 0]
+        return np.where(values[:, 0] > 0, ratio ** (1.0 / span) - 1.0, np.nan)
+
+
+def annual_growth(values):
+    """
+    Year-on-year growth rates, regions x (years - 1)
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(values[:, :-1] > 0, values[:, 1:] / values[:, :-1] - 1.0, np.nan)
+
+
+def rolling_growth(values, window=ROLLING_WINDOW):
+    """
+    Mean annual growth over the trailing window, regions x (years - window), via cumulative sums
+    """
+    growth = np.nan_to_num(annual_growth(values))
+    cumulative = np.concatenate([np.zeros((len(growth), 1)), np.cumsum(growth, axis=1)], axis=1)
+    return (cumulative[:, window:] - cumulative[:, :-window]) / window
+
+
+def interpolate(years, values, at_years, anchor_years=CENSUS_YEARS):
+    """
+    Linear interpolation between the anchor (census) years for every region at once.
+
+    Returns regions x len(at_years); years outside the anchors take the nearest anchor.
+    """
+    anchors = np.asarray(anchor_years)
+    anchor_values = values[:, np.searchsorted(years, anchors)]
+    at_years = np.asarray(at_years, dtype=float)
+    right = np.clip(np.searchsorted(anchors, at_years, side="right"), 1, len(anchors) - 1)
+    left = right - 1
+    fraction = np.clip((at_years - anchors[left]) / (anchors[right] - anchors[left]), 0.0, 1.0)
+    return anchor_values[:, left] * (1.0 - fraction) + anchor_values[:, right] * fraction
+
+
+def project(years, values, horizon=PROJECTION_YEARS, fit_years=FIT_YEARS):
+    """
+    Linear trend projection fitted to the last fit_years, all regions in one least-squares
+    solve, clipped at zero.
+
+    Returns:
+    (np.ndarray, np.ndarray): The projected years and regions x horizon values.
+    """
+    fit_x = years[-fit_years:]
+    slope, intercept = np.polyfit(fit_x - fit_x[0], values[:, -fit_years:].T, 1)
+    future = np.arange(years[-1] + 1, years[-1] + horizon + 1)
+    projected = intercept[:, None] + slope[:, None] * (future - fit_x[0])
+    return future, np.maximum(projected, 0.0)
+
+
+def growth_summary(population, region_column="SA2 name"):
+    """
+    Growth and projection metrics for every region of a population table, computed once
+    per data version (content hash) and shared through the cache.
+
+    Returns a dict with regions, years, values, the CAGR per region, rolling growth,
+    intercensal estimates at the observed years, projection years and projected values.
+    """
+    regions, years, values = population_matrix(population, region_column)
+    digest = hashlib.sha1(values.tobytes() + "\x00".join(map(str, regions)).encode("utf-8")).hexdigest()
+
+    def compute():
+        future, projected = project(years, values)
+        return {
+            "regions": regions,
+            "years": years,
+            "values": values,
+            "cagr": cagr(years, values),
+            "rolling_growth": rolling_growth(values),
+            "rolling_years": years[ROLLING_WINDOW:],
+            "intercensal": interpolate(years, values, years),
+            "projection_years": future,
+            "projection": projected,
+        }
+
+    return shared_cache.get_or_load(("population_analytics", region_column, digest), compute,
+                                    dataset="population_analytics", weight=DATASET_CACHE_WEIGHT)
+
+
+def growth_table(summary):
+    """
+    One row per region: latest population, CAGR, latest rolling growth and final projection
+    """
+    return pd.DataFrame({
+        "Region": summary["regions"],
+        f"Population {summary['years'][-1]}": summary["values"][:, -1],
+        "CAGR (%)": summary["cagr"] * 100,
+        f"{ROLLING_WINDOW}-year growth (%/yr)": summary["rolling_growth"][:, -1] * 100,
+        f"Projected {summary['projection_years'][-1]}": summary["projection"][:, -1],
+    })
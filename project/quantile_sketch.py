@@ -0,0 +1,140 @@
+import math
+
+import numpy as np
+
+# Capacity shrink factor between adjacent compactor levels (from the KLL paper)
+LEVEL_DECAY = 2.0 / 3.0
+MIN_LEVEL_CAPACITY = 2
+
+
+class KLLSketch:
+    """
+    Mergeable streaming quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Items are kept in compactor levels; an item on level h stands for 2**h inputs.
+    A full level is sorted and every other item (random offset) is promoted to the
+    next level, so memory stays O(k log n) while the rank error is about 1.7 / k.
+    Two sketches built over different chunks merge into one for the union, so
+    chunked or parallel ingestion can combine partial results.
+    """
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(math.ceil(self.k * LEVEL_DECAY ** depth)), MIN_LEVEL_CAPACITY)
+
+    def _compress(self):
+        while sum(len(items) for items in self.levels) > sum(self._capacity(h) for h in range(len(self.levels))):
+            for level, items in enumerate(self.levels):
+                if len(items) < self._capacity(level):
+                    continue
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays on its level so the total weight is preserved
+                keep = items[:len(items) % 2]
+                paired = items[len(keep):]
+                promoted = paired[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                break
+
+    def update(self, values):
+        """
+        Add one value or an array of values
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        # The whole batch joins level 0 and is compacted in one pass; compacting per
+        # capacity-sized slice is very slow once the sketch is deep and level 0 is tiny
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Fold another sketch into this one, level by level
+        """
+        if not other.count:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        """
+        Approximate values at the given quantiles (0 = min, 1 = max)
+        """
+        qs = np.asarray(qs, dtype=float)
+        if not self.count:
+            return np.full(qs.shape, np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        ranks = qs * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, ranks, side="left"), len(items) - 1)
+        values = items[positions]
+        # The extremes are tracked exactly
+        values = np.where(qs <= 0, self.min, np.where(qs >= 1, self.max, values))
+        return values
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    def to_dict(self):
+        return {"k": self.k, "count": self.count, "min": self.min, "max": self.max,
+                "levels": [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["k"])
+        sketch.count = data["count"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        sketch.levels = [np.asarray(items, dtype=float) for items in data["levels"]]
+        return sketch
+
+
+def group_sketches(keys, values, k=200, seed=None):
+    """
+    One sketch per distinct key over the matching values (e.g. one chunk of a file)
+    """
+    keys = np.asarray(keys)
+    values = np.asarray(values, dtype=float)
+    uniques, codes = np.unique(keys, return_inverse=True)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    return {key: KLLSketch(k, seed).update(values[order[bounds[i]:bounds[i + 1]]])
+            for i, key in enumerate(uniques.tolist())}
+
+
+def merge_group_sketches(total, partial):
+    """
+    Merge per-group partial sketches into the running totals (in place)
+    """
+    for key, sketch in partial.items():
+        if key in total:
+            total[key].merge(sketch)
+        else:
+            total[key] = sketch
+    return total
@@ -0,0 +1,330 @@
+import functools
+import hashlib
+import hmac
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from cache_backends import backend_from_url
+from single_flight import SingleFlight
+
+# Memory budget for everything held in the shared cache (bytes)
+DEFAULT_BUDGET_BYTES = int(os.environ.get("DASHBOARD_CACHE_BYTES", 256 * 1024 * 1024))
+
+# Number of least recently used entries compared when choosing what to evict
+EVICTION_SAMPLE = 5
+
+# Cross-process second level, e.g. sqlite:////app/cache/dashboard.sqlite (see cache_backends.py)
+BACKEND_URL = os.environ.get("DASHBOARD_CACHE_BACKEND", "")
+
+# Key for signing values in the shared backend; every replica must use the same secret.
+# Values are pickled, so unsigned payloads from a writable store are never unpickled.
+BACKEND_SECRET = os.environ.get("DASHBOARD_CACHE_SECRET", "")
+
+
+def _read_only(array):
+    array = np.array(array, copy=True)
+    array.flags.writeable = False
+    return array
+
+
+def _can_freeze(dtype):
+    # pandas 2.1 cannot compare read-only object arrays, so only numeric columns are frozen
+    return isinstance(dtype, np.dtype) and dtype != object
+
+
+def freeze(value):
+    """
+    Make a value safe to share between sessions: arrays read-only, lists as tuples.
+
+    Frames and Series are rebuilt once around read-only copies of their numeric
+    columns, so a view handed out by share() raises on in-place writes instead of
+    changing the shared data. Object and extension (e.g. categorical) columns are
+    kept as they are.
+    """
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+        return value
+    if isinstance(value, pd.DataFrame):
+        columns = {position: _read_only(column) if _can_freeze(column.dtype) else column.array
+                   for position, (_, column) in enumerate(value.items())}
+        frozen = pd.DataFrame(columns, index=value.index, copy=False)
+        frozen.columns = value.columns
+        return frozen
+    if isinstance(value, pd.Series):
+        if not _can_freeze(value.dtype):
+            return value
+        return pd.Series(_read_only(value.to_numpy()), index=value.index, name=value.name, copy=False)
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def share(value):
+    """
+    Hand out a cached value.
+
+    Frames and Series are shallow views of the frozen value: no data is copied,
+    and an in-place write raises ValueError (read-only) rather than reaching other
+    sessions. Adding or replacing columns only changes the caller's view. Object and
+    extension columns are not read-only, so those are copied for each caller
+    (for object columns only the array of references, not the strings).
+    """
+    if isinstance(value, pd.DataFrame):
+        view = value.copy(deep=False)
+        for position, dtype in enumerate(value.dtypes):
+            if not _can_freeze(dtype):
+                view.isetitem(position, value.iloc[:, position].copy())
+        return view
+    if isinstance(value, pd.Series):
+        return value.copy(deep=False) if _can_freeze(value.dtype) else value.copy()
+    if isinstance(value, tuple):
+        return tuple(share(item) for item in value)
+    return value
+
+
+def deep_sizeof(value, seen=None):
+    """
+    Approximate memory held by a cached value, including nested objects
+    """
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return value.nbytes + sum(deep_sizeof(item, seen) for item in value.ravel())
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(deep_sizeof(item, seen) for item in value)
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ("value", "size", "dataset", "weight", "hits", "expires")
+
+    def __init__(self, value, size, dataset, weight, expires):
+        self.value = value
+        self.size = size
+        self.dataset = dataset
+        self.weight = weight
+        self.hits = 0
+        self.expires = expires
+
+
+class SharedCache:
+    """
+    Process-wide cache of immutable datasets and per-street results with a byte budget,
+    optionally backed by a store shared with other processes.
+
+    A hit does not pickle/unpickle the value (unlike st.cache_data); callers get
+    read-only views of frames (see share()) and the frozen value otherwise. Each entry's deep size
+    is measured when it is stored. When the total exceeds the budget, the cache
+    evicts the entry with the lowest weight * (hits + 1) among the EVICTION_SAMPLE
+    least recently used entries, so recency, frequency and the dataset's weight
+    all count.
+
+    With a backend, a local miss first checks the shared store, and every value
+    loaded upstream is written to it, so one replica's fetch warms the others.
+    Backend payloads carry an HMAC-SHA256 of the key and value under secret, and
+    are only unpickled when it verifies; without a secret the backend is not used.
+    """
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES, backend=None, secret=BACKEND_SECRET):
+        if backend is not None and not secret:
+            print("DASHBOARD_CACHE_SECRET is not set; the shared cache backend is disabled")
+            backend = None
+        self.budget_bytes = budget_bytes
+        self.backend = backend
+        self._secret = secret.encode("utf-8") if isinstance(secret, str) else secret
+        self.used_bytes = 0
+        self._entries = OrderedDict()
+        self._stats = {}
+        self._backend_hits = 0
+        self._loads = SingleFlight()
+        self._lock = threading.Lock()
+
+    def _dataset_stats(self, dataset):
+        return self._stats.setdefault(dataset, {"hits": 0, "misses": 0, "evictions": 0, "rejected": 0})
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.used_bytes -= entry.size
+        return entry
+
+    def _evict_to_fit(self):
+        while self.used_bytes > self.budget_bytes and self._entries:
+            candidates = []
+            for key, entry in self._entries.items():
+                candidates.append((entry.weight * (entry.hits + 1), len(candidates), key))
+                if len(candidates) == EVICTION_SAMPLE:
+                    break
+            _, _, victim = min(candidates)
+            self._dataset_stats(self._remove(victim).dataset)["evictions"] += 1
+
+    def _lookup(self, key, dataset):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires is not None and entry.expires <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._dataset_stats(dataset)["misses"] += 1
+                return None
+            entry.hits += 1
+            self._entries.move_to_end(key)
+            self._dataset_stats(dataset)["hits"] += 1
+            return entry
+
+    def get_or_load(self, key, loader, ttl=None, dataset="default", weight=1.0, keep=None):
+        """
+        Return the cached value for key, loading (once, across threads) on a miss.
+
+        keep: optional predicate; values it rejects (e.g. empty results from a failed
+        request) are returned but not stored.
+        """
+        entry = self._lookup(key, dataset)
+        if entry is not None:
+            return share(entry.value)
+
+        def load():
+            value, remaining = self._backend_get(key)
+            if value is None:
+                value = freeze(loader())
+                if keep is not None and not keep(value):
+                    return value
+                remaining = ttl
+                self._backend_set(key, value, ttl)
+            self._store(key, value, remaining, dataset, weight)
+            return value
+
+        return share(self._loads.do(key, load))
+
+    def _store(self, key, value, ttl, dataset, weight):
+        size = deep_sizeof(value)
+        with self._lock:
+            if size > self.budget_bytes:
+                # Larger than the whole budget: hand it out but do not keep it
+                self._dataset_stats(dataset)["rejected"] += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            expires = None if ttl is None else time.monotonic() + ttl
+            self._entries[key] = _Entry(value, size, dataset, weight, expires)
+            self.used_bytes += size
+            self._evict_to_fit()
+
+    @staticmethod
+    def _backend_key(key):
+        return "dashboard:" + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+
+    def _signature(self, backend_key, data):
+        # The key is signed too, so a valid payload cannot be replayed under another key
+        return hmac.new(self._secret, backend_key.encode("utf-8") + data, hashlib.sha256).digest()
+
+    def _backend_get(self, key):
+        """
+        Value stored by any process for key, with its remaining TTL
+        """
+        if self.backend is None:
+            return None, None
+        backend_key = self._backend_key(key)
+        try:
+            payload = self.backend.get(backend_key)
+            if payload is None:
+                return None, None
+            signature, data = payload[:32], payload[32:]
+            if not hmac.compare_digest(signature, self._signature(backend_key, data)):
+                print(f"Cache backend entry {backend_key} has an invalid signature; ignoring it")
+                return None, None
+            expires_at, value = pickle.loads(data)
+        except Exception as e:
+            print(f"Cache backend read failed: {str(e)}")
+            return None, None
+        with self._lock:
+            self._backend_hits += 1
+        remaining = None if expires_at is None else expires_at - time.time()
+        return freeze(value), remaining
+
+    def _backend_set(self, key, value, ttl):
+        if self.backend is None:
+            return
+        try:
+            expires_at = None if ttl is None else time.time() + ttl
+            data = pickle.dumps((expires_at, value), protocol=pickle.HIGHEST_PROTOCOL)
+            backend_key = self._backend_key(key)
+            self.backend.set(backend_key, self._signature(backend_key, data) + data, ttl)
+        except Exception as e:
+            print(f"Cache backend write failed: {str(e)}")
+
+    def stats(self):
+        """
+        Occupancy and hit/miss/eviction counts, overall and per dataset
+        """
+        with self._lock:
+            datasets = {name: dict(counts, entries=0, bytes=0) for name, counts in self._stats.items()}
+            for entry in self._entries.values():
+                dataset = datasets.setdefault(entry.dataset, {"hits": 0, "misses": 0, "evictions": 0,
+                                                              "rejected": 0, "entries": 0, "bytes": 0})
+                dataset["entries"] += 1
+                dataset["bytes"] += entry.size
+            return {
+                "budget_bytes": self.budget_bytes,
+                "used_bytes": self.used_bytes,
+                "entries": len(self._entries),
+                "hits": sum(d["hits"] for d in datasets.values()),
+                "misses": sum(d["misses"] for d in datasets.values()),
+                "evictions": sum(d["evictions"] for d in datasets.values()),
+                "backend": type(self.backend).__name__ if self.backend is not None else None,
+                "backend_hits": self._backend_hits,
+                "datasets": datasets,
+            }
+
+    def discard(self, key):
+        """
+        Drop one entry from this process (the shared backend keeps it until it expires)
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.used_bytes = 0
+
+
+shared_cache = SharedCache(backend=backend_from_url(BACKEND_URL))
+
+
+def cached(ttl=None, dataset=None, weight=1.0, keep=None):
+    """
+    Decorator caching a loader's result in the shared cache, keyed by function and arguments.
+
+    dataset groups entries in the statistics (default: the function name); weight
+    makes a dataset's entries more (> 1) or less (< 1) likely to survive eviction;
+    keep is passed on to SharedCache.get_or_load.
+    """
+    def decorator(loader):
+        name = dataset or loader.__name__
+
+        @functools.wraps(loader)
+        def wrapper(*args, **kwargs):
+            key = (loader.__module__, loader.__qualname__, args, tuple(sorted(kwargs.items())))
+            return shared_cache.get_or_load(key, lambda: loader(*args, **kwargs),
+                                            ttl=ttl, dataset=name, weight=weight, keep=keep)
+        return wrapper
+    return decorator
@@ -0,0 +1,69 @@
+import functools
+import json
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one execution.
+
+    The first caller runs the function; callers arriving while it is in flight
+    wait for it and receive the same result (or exception). Nothing is cached
+    once the call finishes.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+# Shared by every upstream fetcher in the process (Streamlit sessions and api_server.py)
+upstream_calls = SingleFlight()
+
+
+def coalesced(endpoint):
+    """
+    Decorator sharing one in-flight upstream request per endpoint and arguments
+    """
+    def decorator(fetch):
+        @functools.wraps(fetch)
+        def wrapper(*args, **kwargs):
+            key = (endpoint, json.dumps([args, sorted(kwargs.items())], sort_keys=True, default=str))
+            return upstream_calls.do(key, lambda: fetch(*args, **kwargs))
+        return wrapper
+    return decorator
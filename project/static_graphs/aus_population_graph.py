@@ -1,19 +1,19 @@
 import streamlit as st
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import pandas as pd
 import os
+from data_sources import read_snapshot
 
 def get_population_data(file_name):
     
     base_dir = os.path.dirname(__file__)
     file_path = os.path.join(base_dir, file_name)
-    population_growth = pd.read_csv(file_path)
+    population_growth = read_snapshot(file_path)
     
     return population_growth
 
 
-def plotting_aus_population_growth(population_growth):
+def build_aus_population_figure(population_growth):
     # Filter only Vic and Aus data
     regions = ["Total Victoria", "Total Australia"]
     population_growth_aus = population_growth[population_growth["region"].isin(regions)]
@@ -74,7 +74,11 @@ def plotting_aus_population_growth(population_growth):
     population_growth_plot.update_yaxes(title_text=regions[0], range=[0, vic_max], autorange=False, secondary_y=False)
     population_growth_plot.update_yaxes(title_text=regions[1], range=[0, aus_max], autorange=False, secondary_y=True)
     
-    st.plotly_chart(population_growth_plot, use_container_width=True)
+    return population_growth_plot
+
+
+def plotting_aus_population_growth(population_growth):
+    st.plotly_chart(build_aus_population_figure(population_growth), use_container_width=True)
 
 if __name__ == "__main__":
     # Load the data
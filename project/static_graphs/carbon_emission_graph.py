@@ -1,17 +1,17 @@
 import streamlit as st
 import plotly.graph_objects as go
-import pandas as pd
 import os
+from data_sources import read_snapshot
 
 def get_emission_data(file_name):
     
     base_dir = os.path.dirname(__file__)
     file_path = os.path.join(base_dir, file_name)
-    carbon_emission = pd.read_csv(file_path)
+    carbon_emission = read_snapshot(file_path)
     
     return carbon_emission
 
-def plotting_carbon_emission(carbon_emission):
+def build_carbon_emission_figure(carbon_emission):
     # Sort by carbon_emission descending
     carbon_emission_sorted = carbon_emission.sort_values(by='carbon_emission', ascending=False).reset_index(drop=True)
     set2_colors = ["#66c2a5", "#fc8d62", "#8da0cb", "#e78ac3", "#a6d854", "#ffd92f", "#e5c494", "#b3b3b3"]
@@ -37,7 +37,11 @@ def plotting_carbon_emission(carbon_emission):
         paper_bgcolor='white'
     )
     
-    st.plotly_chart(carbon_emission_plot, use_container_width = True)
+    return carbon_emission_plot
+
+
+def plotting_carbon_emission(carbon_emission):
+    st.plotly_chart(build_carbon_emission_figure(carbon_emission), use_container_width = True)
     
 if __name__ == "__main__":
     # Load the data
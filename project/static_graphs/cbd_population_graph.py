@@ -1,18 +1,18 @@
 import streamlit as st
 import plotly.graph_objects as go
-import pandas as pd
 import os
+from data_sources import read_snapshot
 
 def get_population_data(file_name):
     
     base_dir = os.path.dirname(__file__)
     file_path = os.path.join(base_dir, file_name)
-    population_growth = pd.read_csv(file_path)
+    population_growth = read_snapshot(file_path)
     
     return population_growth
 
 
-def plotting_cbd_population_growth(population_growth):
+def build_cbd_population_figure(population_growth):
     # Filter only CBD data
     regions = ["Melbourne CBD - East", "Melbourne CBD - North", "Melbourne CBD - West"]
     population_growth_cbd = population_growth[population_growth["region"].isin(regions)]
@@ -60,7 +60,11 @@ def plotting_cbd_population_growth(population_growth):
         yaxis=dict(range=[0, y_max])
     )
     
-    st.plotly_chart(population_growth_plot, use_container_width=True)
+    return population_growth_plot
+
+
+def plotting_cbd_population_growth(population_growth):
+    st.plotly_chart(build_cbd_population_figure(population_growth), use_container_width=True)
 
 if __name__ == "__main__":
     # Load the data
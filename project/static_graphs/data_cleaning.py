@@ -1,5 +1,8 @@
 import pandas as pd
 import os
+from emission_cube import build_emission_cube, build_emission_sketches, emission_quantiles
+from multi_hot import decode_list_columns
+from csv_reader import read_csv
 
 
 def vehicle_ownership_cleaning(file_name):
@@ -15,7 +18,7 @@ def vehicle_ownership_cleaning(file_name):
     # Load the data
     base_dir = os.path.dirname(__file__)
     file_path = os.path.join(base_dir, file_name)
-    vehicle_ownership = pd.read_csv(file_path, skiprows=1)
+    vehicle_ownership = read_csv(file_path, skiprows=1)
     
     # Rename columns
     vehicle_ownership.columns = [
@@ -60,7 +63,7 @@ def population_growth_cleaning(file_name):
     base_dir = os.path.dirname(__file__)
     file_path = os.path.join(base_dir, file_name)
     # Read after skipping 6 rows, no header
-    population_growth = pd.read_csv(file_path, skiprows=6, header=None)
+    population_growth = read_csv(file_path, skiprows=6, header=None)
     
     # Set header
     header = []
@@ -136,7 +139,7 @@ def carbon_emission_cleaning(file_name):
     # Load the data
     base_dir = os.path.dirname(__file__)
     file_path = os.path.join(base_dir, file_name)
-    carbon_emission = pd.read_csv(file_path)
+    carbon_emission = read_csv(file_path)
     
     # Keep only the "Transport", "Vehicle Type", and "CarbonEmission" columns
     carbon_emission = carbon_emission[["Transport", "Vehicle Type", "CarbonEmission"]]
@@ -157,6 +160,69 @@ def carbon_emission_cleaning(file_name):
     return average_emission
 
 
+def carbon_emission_cube(file_name):
+    """
+    Builds the emissions aggregation cube from the raw survey with the specified file name.
+
+    Unlike carbon_emission_cleaning, it keeps Transport, Vehicle Type, Diet, Heating
+    Energy Source and distance band, so filtered averages can be re-aggregated from it.
+
+    Parameters:
+    file_name (str): The name of the CSV file containing carbon emissions data.
+
+    Returns:
+    pd.DataFrame: sum/count/min/max of CarbonEmission per combination of dimensions.
+    """
+    # Load the data
+    base_dir = os.path.dirname(__file__)
+    file_path = os.path.join(base_dir, file_name)
+    carbon_emission = read_csv(file_path)
+
+    return build_emission_cube(carbon_emission)
+
+
+def carbon_emission_decoding(file_name):
+    """
+    Decodes the list-valued columns of the carbon emissions data (Recycling, Cooking_With
+    and any future ones) into multi-hot boolean columns and a bitmask column each.
+
+    Parameters:
+    file_name (str): The name of the CSV file containing carbon emissions data.
+
+    Returns:
+    pd.DataFrame: The survey with "<column>: <category>" and "<column> Mask" columns.
+    """
+    # Load the data
+    base_dir = os.path.dirname(__file__)
+    file_path = os.path.join(base_dir, file_name)
+    carbon_emission = read_csv(file_path)
+
+    carbon_emission_decoded, categories = decode_list_columns(carbon_emission)
+    for column, column_categories in categories.items():
+        print(f"{column} mask bits: {', '.join(column_categories)}")
+
+    return carbon_emission_decoded
+
+
+def carbon_emission_quantiles(file_name):
+    """
+    Sketches the carbon emissions distribution per transport type in bounded memory.
+
+    The file is read in chunks; per-chunk KLL sketches are merged, so the same code
+    handles survey files of any size.
+
+    Parameters:
+    file_name (str): The name of the CSV file containing carbon emissions data.
+
+    Returns:
+    pd.DataFrame: Count and approximate percentiles (p0 ... p100) per transport type.
+    """
+    base_dir = os.path.dirname(__file__)
+    file_path = os.path.join(base_dir, file_name)
+
+    return emission_quantiles(build_emission_sketches(file_path))
+
+
 def save_cleaned_dataframe(df, file_name):
     """
     Save the cleaned DataFrame to the project folder as a CSV.
@@ -168,12 +234,18 @@ def save_cleaned_dataframe(df, file_name):
     print(f"{file_name} saved to {output_path}")
 
 
-# Execute the functions for each dataset
-
-vehicle_ownership_clean = vehicle_ownership_cleaning("vehicle_ownership_raw.csv")
-population_growth_clean = population_growth_cleaning("population_growth_raw.csv")
-carbon_emission_clean = carbon_emission_cleaning("carbon_emission_raw.csv")
-
-save_cleaned_dataframe(vehicle_ownership_clean, "vehicle_ownership_clean.csv")
-save_cleaned_dataframe(population_growth_clean, "population_growth_clean.csv")
-save_cleaned_dataframe(carbon_emission_clean, "carbon_emission_clean.csv")
\ No newline at end of file
+if __name__ == "__main__":
+    # Execute the functions for each dataset
+    vehicle_ownership_clean = vehicle_ownership_cleaning("vehicle_ownership_raw.csv")
+    population_growth_clean = population_growth_cleaning("population_growth_raw.csv")
+    carbon_emission_clean = carbon_emission_cleaning("carbon_emission_raw.csv")
+    carbon_emission_cube_clean = carbon_emission_cube("carbon_emission_raw.csv")
+    carbon_emission_decoded = carbon_emission_decoding("carbon_emission_raw.csv")
+    carbon_emission_quantile_table = carbon_emission_quantiles("carbon_emission_raw.csv")
+
+    save_cleaned_dataframe(vehicle_ownership_clean, "vehicle_ownership_clean.csv")
+    save_cleaned_dataframe(population_growth_clean, "population_growth_clean.csv")
+    save_cleaned_dataframe(carbon_emission_clean, "carbon_emission_clean.csv")
+    save_cleaned_dataframe(carbon_emission_cube_clean, "carbon_emission_cube.csv")
+    save_cleaned_dataframe(carbon_emission_decoded, "carbon_emission_decoded.csv")
+    save_cleaned_dataframe(carbon_emission_quantile_table, "carbon_emission_quantiles.csv")
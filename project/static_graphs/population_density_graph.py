@@ -1,17 +1,17 @@
 import streamlit as st
 import plotly.graph_objects as go
-import pandas as pd
 import os
+from data_sources import read_snapshot
 
 def get_population_data(file_name):
     
     base_dir = os.path.dirname(__file__)
     file_path = os.path.join(base_dir, file_name)
-    population_growth = pd.read_csv(file_path)
+    population_growth = read_snapshot(file_path)
     
     return population_growth
 
-def population_density_plotting(population_growth):
+def build_population_density_figure(population_growth):
 
     # Select regions and years
     regions = ["Melbourne CBD - East", "Melbourne CBD - North", "Melbourne CBD - West", "Total Victoria", "Total Australia"]
@@ -61,7 +61,11 @@ def population_density_plotting(population_growth):
         plot_bgcolor='white',
         paper_bgcolor='white'
     )
-    st.plotly_chart(population_density_plot, use_container_width=True)
+    return population_density_plot
+
+
+def population_density_plotting(population_growth):
+    st.plotly_chart(build_population_density_figure(population_growth), use_container_width=True)
     
 if __name__ == "__main__":
     # Load the data
@@ -1,17 +1,17 @@
 import streamlit as st
 import plotly.graph_objects as go
-import pandas as pd
 import os
+from data_sources import read_snapshot
 
 def get_ownership_data(file_name):
     
     base_dir = os.path.dirname(__file__)
     file_path = os.path.join(base_dir, file_name)
-    vehicle_ownership = pd.read_csv(file_path)
+    vehicle_ownership = read_snapshot(file_path)
 
     return vehicle_ownership
 
-def vehicle_ownership_line_chart(vehicle_ownership):
+def build_vehicle_ownership_figure(vehicle_ownership):
     years = [col for col in vehicle_ownership.columns if col.isdigit()]
     set2_colors = ["#e78ac3", "#a6d854"]
 
@@ -55,7 +55,11 @@ def vehicle_ownership_line_chart(vehicle_ownership):
         plot_bgcolor='white',
         paper_bgcolor='white'
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+def vehicle_ownership_line_chart(vehicle_ownership):
+    st.plotly_chart(build_vehicle_ownership_figure(vehicle_ownership), use_container_width=True)
 
 
 if __name__ == "__main__":
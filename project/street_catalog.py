@@ -0,0 +1,159 @@
+import hashlib
+import json
+import re
+import threading
+
+# Fields of a /streets response object that may hold the catalog, in the shapes the API has returned
+CATALOG_FIELDS = ("on_street_list", "on street list", "body", "result")
+
+# Quoted street names in a body that is not valid JSON
+STREET_PATTERN = re.compile(r'"([^"]*street[^"]*)"', re.IGNORECASE)
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+def _skip(text, position):
+    return _WHITESPACE.match(text, position).end()
+
+
+def iter_array(text, position):
+    """
+    Decode the JSON array starting at text[position] one element at a time
+    """
+    position = _skip(text, position + 1)
+    if text.startswith("]", position):
+        return
+    while True:
+        item, position = _decoder.raw_decode(text, position)
+        yield item
+        position = _skip(text, position)
+        if text.startswith(",", position):
+            position = _skip(text, position + 1)
+        elif text.startswith("]", position):
+            return
+        else:
+            raise ValueError(f"Expected ',' or ']' at position {position}")
+
+
+def _iter_value(value):
+    """
+    Raw names held by an already decoded catalog field
+    """
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict):
+        for field in CATALOG_FIELDS:
+            if field in value:
+                return _iter_value(value[field])
+        return []
+    if isinstance(value, str):
+        # body is usually the catalog encoded as a JSON string
+        try:
+            return list(iter_catalog(value))
+        except ValueError:
+            return [name for name in STREET_PATTERN.findall(value) if name.lower() != "on street list"]
+    return []
+
+
+def iter_catalog(text):
+    """
+    Yield the raw street names of a /streets response.
+
+    The response is either a bare list or an object whose first catalog field
+    (on_street_list, "on street list", body or result) holds the list. The list is
+    decoded element by element, and the fields before it are skipped without being kept.
+
+    >>> list(iter_catalog('{"on street list": ["Collins Street", "Flinders Lane"]}'))
+    ['Collins Street', 'Flinders Lane']
+    >>> list(iter_catalog(json.dumps({"body": json.dumps({"on street list": ["Collins Street"]})})))
+    ['Collins Street']
+    """
+    position = _skip(text, 0)
+    if text.startswith("[", position):
+        yield from iter_array(text, position)
+        return
+    if not text.startswith("{", position):
+        raise ValueError("Street catalog is neither a JSON list nor an object")
+
+    position = _skip(text, position + 1)
+    while text.startswith('"', position):
+        field, position = _decoder.raw_decode(text, position)
+        position = _skip(text, position)
+        if not text.startswith(":", position):
+            raise ValueError(f"Expected ':' at position {position}")
+        position = _skip(text, position + 1)
+
+        if field in CATALOG_FIELDS:
+            if text.startswith("[", position):
+                yield from iter_array(text, position)
+            else:
+                yield from _iter_value(_decoder.raw_decode(text, position)[0])
+            return
+
+        position = _skip(text, _decoder.raw_decode(text, position)[1])
+        if text.startswith(",", position):
+            position = _skip(text, position + 1)
+
+
+class StreetCatalog:
+    """
+    The canonical (whitespace-normalized, deduplicated) street names with their hash.
+
+    A response identical to the last one is not parsed again. Otherwise only names
+    that were not in the last response are normalized, and the added and removed
+    names are reported.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.digest = None
+        self.etag = None
+        self.added = []
+        self.removed = []
+        self._content_hash = None
+        self._canonical = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, content, etag=None):
+        """
+        Update the catalog from a response body (bytes); returns the street names
+        """
+        content_hash = hashlib.sha256(content).hexdigest()
+        with self._lock:
+            if content_hash == self._content_hash:
+                self.etag = etag or self.etag
+                return self.names
+            previous = self._canonical
+
+        canonical = {}
+        names = {}
+        for raw in iter_catalog(content.decode("utf-8")):
+            if not isinstance(raw, str):
+                continue
+            name = canonical.get(raw)
+            if name is None:
+                name = previous.get(raw)
+                if name is None:
+                    # str.split() also breaks on the line breaks in the upstream names
+                    name = " ".join(raw.split())
+                canonical[raw] = name
+            if name:
+                names[name] = None
+        names = list(names)
+        digest = hashlib.sha256("\n".join(names).encode("utf-8")).hexdigest()
+
+        with self._lock:
+            if digest != self.digest:
+                old_names = set(self.names)
+                new_names = set(names)
+                self.added = [name for name in names if name not in old_names]
+                self.removed = [name for name in self.names if name not in new_names]
+                print(f"Street catalog {digest[:8]}: {len(names)} streets, "
+                      f"{len(self.added)} added, {len(self.removed)} removed")
+                self.names = names
+                self.digest = digest
+            self.etag = etag
+            self._content_hash = content_hash
+            self._canonical = canonical
+            return self.names